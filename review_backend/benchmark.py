@@ -0,0 +1,816 @@
+"""
+Benchmarks for the review backend
+Runs against the PostgreSQL database configured in db_config.py (use a scratch database!)
+Usage:
+    python benchmark.py analytics-queries
+    python benchmark.py index-usage
+    python benchmark.py generation-profiles --sample labelled.jsonl
+    python benchmark.py quantization-parity
+    python benchmark.py ws-fanout
+    python benchmark.py analyze-latency [--engine real]
+    python benchmark.py ingest queue-drain
+    python benchmark.py endpoint-latency --scales 10000,100000,1000000
+    ML_WARMUP=all python benchmark.py cold-start
+Every result is printed as one JSON line; --output results.json also writes them, with the
+commit and a timestamp, to one file so runs can be compared between commits.
+ML-dependent benchmarks use a StubEngine unless --engine real is passed.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from psycopg2.extensions import cursor as _BaseCursor
+from psycopg2.extras import execute_values
+from db_config import get_db_connection
+from main import init_db, _compute_analytics, _compute_business_stats, _fetch_review_rows, CLAIM_REVIEWS_SQL
+import rollups
+from response_cache import RESPONSE_CACHE
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+
+class CountingCursor(_BaseCursor):
+    """Cursor that counts executed statements"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = 0
+
+    def execute(self, query, vars=None):
+        self.statements += 1
+        return super().execute(query, vars)
+
+
+class RecordingCursor(_BaseCursor):
+    """Cursor that keeps the bound SQL of every executed statement"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorded = []
+
+    def execute(self, query, vars=None):
+        self.recorded.append(self.mogrify(query, vars).decode())
+        return super().execute(query, vars)
+
+
+def seed_reviews(cursor, business_id, review_count, category_count, aspects_per_review=3, start=0, rebuild=True):
+    """Insert synthetic reviews with aspect sentiments for one business"""
+    now = datetime.datetime.now()
+    categories = [f"category_{i}" for i in range(category_count)]
+    review_rows = []
+    aspect_rows = []
+    for i in range(start, start + review_count):
+        review_id = str(uuid.uuid4())
+        review_rows.append((
+            review_id, business_id, f"Synthetic review {i} " + "lorem ipsum " * 20,
+            "Bench", random.randint(1, 5), now - datetime.timedelta(minutes=i),
+            random.choice(SENTIMENTS)
+        ))
+        for category in random.sample(categories, min(aspects_per_review, category_count)):
+            aspect_rows.append((review_id, "", category, random.choice(SENTIMENTS)))
+
+    execute_values(cursor, '''
+        INSERT INTO reviews (id, business_id, text, customer_name, rating, date, overall_sentiment)
+        VALUES %s
+    ''', review_rows, page_size=1000)
+    execute_values(cursor, '''
+        INSERT INTO aspect_sentiments (review_id, aspect_term, category, sentiment)
+        VALUES %s
+    ''', aspect_rows, page_size=1000)
+    if rebuild:
+        rollups.rebuild_rollups(cursor, business_id)
+
+
+def seed_raw_reviews(cursor, business_id, count, pending=10):
+    """Insert processed queue rows plus a few pending ones so the queue tables have volume"""
+    now = datetime.datetime.now()
+    execute_values(cursor, '''
+        INSERT INTO raw_reviews (business_id, review_text, status, model_type, created_at)
+        VALUES %s
+    ''', [
+        (business_id, f"Queued review {i}", "pending" if i < pending else "completed", "amazon",
+         now - datetime.timedelta(seconds=i))
+        for i in range(count)
+    ], page_size=1000)
+
+
+def delete_business_reviews(cursor, business_id):
+    cursor.execute("DELETE FROM raw_reviews WHERE business_id = %s", (business_id,))
+    cursor.execute("DELETE FROM review_rollups WHERE business_id = %s", (business_id,))
+    cursor.execute(
+        "DELETE FROM aspect_sentiments WHERE review_id IN (SELECT id FROM reviews WHERE business_id = %s)",
+        (business_id,)
+    )
+    cursor.execute("DELETE FROM reviews WHERE business_id = %s", (business_id,))
+
+
+def bench_analytics_queries(scales):
+    """Show that get_analytics issues a constant number of queries as data grows"""
+    results = []
+    for review_count, category_count in scales:
+        business_id = f"bench_{uuid.uuid4().hex[:8]}"
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                seed_reviews(cursor, business_id, review_count, category_count)
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor(cursor_factory=CountingCursor) as cursor:
+                    started = time.perf_counter()
+                    _compute_analytics(cursor, business_id, "all")
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    results.append({
+                        "benchmark": "analytics_queries",
+                        "reviews": review_count,
+                        "categories": category_count,
+                        "queries": cursor.statements,
+                        "ms": round(elapsed_ms, 2),
+                    })
+        finally:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    delete_business_reviews(cursor, business_id)
+
+    # Any growth in the statement count with data size is an N+1 regression
+    constant = len({result["queries"] for result in results}) <= 1
+    for result in results:
+        result["ok"] = constant
+    return results
+
+
+def _plan_scans(node, found):
+    """Collect (node type, relation, index) for every scan in an EXPLAIN JSON plan"""
+    if "Relation Name" in node:
+        found.append((node["Node Type"], node["Relation Name"], node.get("Index Name")))
+    for child in node.get("Plans", []):
+        _plan_scans(child, found)
+    return found
+
+
+HOT_TABLES = {"reviews", "aspect_sentiments", "raw_reviews", "review_rollups"}
+
+
+def bench_index_usage(review_count=20000):
+    """EXPLAIN the statements issued by the hot endpoints and report which indexes they use"""
+    business_id = f"bench_{uuid.uuid4().hex[:8]}"
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            seed_reviews(cursor, business_id, review_count, 30)
+            seed_raw_reviews(cursor, business_id, review_count)
+    results = []
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("ANALYZE reviews, aspect_sentiments, raw_reviews, review_rollups")
+            
+            recorder = conn.cursor(cursor_factory=RecordingCursor)
+            statements = []
+            for name, run in [
+                ("stats", lambda: _compute_business_stats(recorder, business_id)),
+                ("analytics", lambda: _compute_analytics(recorder, business_id, "weekly")),
+                ("reviews", lambda: _fetch_review_rows(recorder, business_id, "negative", None, limit=100)),
+            ]:
+                recorder.recorded = []
+                run()
+                statements.extend((f"{name}[{i}]", sql) for i, sql in enumerate(recorder.recorded))
+            recorder.close()
+            
+            with conn.cursor() as cursor:
+                # EXPLAIN without ANALYZE never executes the claim UPDATE
+                statements.append(("claim", cursor.mogrify(CLAIM_REVIEWS_SQL, (300, 5)).decode()))
+                for name, sql in statements:
+                    cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+                    scans = _plan_scans(cursor.fetchone()[0][0]["Plan"], [])
+                    seq_scans = sorted({rel for node, rel, _ in scans if node == "Seq Scan" and rel in HOT_TABLES})
+                    results.append({
+                        "benchmark": "index_usage",
+                        "query": name,
+                        "indexes": sorted({index for _, _, index in scans if index}),
+                        "seq_scans": seq_scans,
+                        "ok": not seq_scans,
+                    })
+    finally:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                delete_business_reviews(cursor, business_id)
+    return results
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_generation_profiles(sample_path, profiles=None):
+    """
+    Accuracy vs latency of each generation profile on a labelled sample
+    Sample: JSONL lines of {"model": "amazon", "text": "...", "labels": [{"category": ..., "sentiment": ...}]}
+    """
+    from ml_engine import GENERATION_PROFILES, MODEL_FOLDERS, UniversalSentimentAnalyzer
+
+    with open(sample_path, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    results = []
+    engines = {}
+    for model_type in sorted({sample["model"] for sample in samples}):
+        engine = engines[model_type] = UniversalSentimentAnalyzer(MODEL_FOLDERS.get(model_type, model_type))
+        if not engine.model:
+            continue
+        model_samples = [sample for sample in samples if sample["model"] == model_type]
+        for profile in profiles or sorted(GENERATION_PROFILES):
+            latencies = []
+            true_positive = predicted_total = expected_total = 0
+            for sample in model_samples:
+                # _generate bypasses the inference cache so every call is a real forward pass
+                started = time.perf_counter()
+                predicted = engine._generate([sample["text"]], profile)[0]
+                latencies.append((time.perf_counter() - started) * 1000)
+
+                predicted_pairs = {(item["category"], item["sentiment"]) for item in predicted}
+                expected_pairs = {(item["category"], item["sentiment"].lower()) for item in sample["labels"]}
+                true_positive += len(predicted_pairs & expected_pairs)
+                predicted_total += len(predicted_pairs)
+                expected_total += len(expected_pairs)
+
+            precision = true_positive / predicted_total if predicted_total else 0.0
+            recall = true_positive / expected_total if expected_total else 0.0
+            results.append({
+                "benchmark": "generation_profiles",
+                "model": model_type,
+                "profile": profile,
+                "samples": len(model_samples),
+                "precision": round(precision, 4),
+                "recall": round(recall, 4),
+                "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+                "mean_ms": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(_percentile(latencies, 50), 2),
+                "p95_ms": round(_percentile(latencies, 95), 2),
+            })
+    return results
+
+
+def _run_generation_profiles(args):
+    if not args.sample:
+        print("generation-profiles: skipped (pass --sample labelled.jsonl)", file=sys.stderr)
+        return []
+    return bench_generation_profiles(args.sample)
+
+
+PARITY_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "parity_reviews.jsonl")
+
+
+def bench_quantization_parity(sample_path=PARITY_FIXTURES, min_exact_match=0.9):
+    """Compare int8 CPU-optimized engines with fp32 ones on a fixture set"""
+    from ml_engine import MODEL_FOLDERS, UniversalSentimentAnalyzer
+
+    with open(sample_path, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    results = []
+    for model_type in sorted({sample["model"] for sample in samples}):
+        folder = MODEL_FOLDERS.get(model_type, model_type)
+        reference = UniversalSentimentAnalyzer(folder, cpu_optimized=False)
+        optimized = UniversalSentimentAnalyzer(folder, cpu_optimized=True)
+        if not reference.model or not optimized.model or not optimized.cpu_optimized:
+            results.append({"benchmark": "quantization_parity", "model": model_type, "skipped": "model missing or not on CPU"})
+            continue
+
+        texts = [sample["text"] for sample in samples if sample["model"] == model_type]
+        timings = {"fp32": 0.0, "int8": 0.0}
+        exact = 0
+        jaccard_total = 0.0
+        for text in texts:
+            outputs = {}
+            for label, engine in (("fp32", reference), ("int8", optimized)):
+                started = time.perf_counter()
+                outputs[label] = {(item["category"], item["sentiment"]) for item in engine._generate([text])[0]}
+                timings[label] += (time.perf_counter() - started) * 1000
+            union = outputs["fp32"] | outputs["int8"]
+            exact += outputs["fp32"] == outputs["int8"]
+            jaccard_total += len(outputs["fp32"] & outputs["int8"]) / len(union) if union else 1.0
+
+        exact_match = exact / len(texts)
+        results.append({
+            "benchmark": "quantization_parity",
+            "model": model_type,
+            "samples": len(texts),
+            "exact_match": round(exact_match, 4),
+            "mean_jaccard": round(jaccard_total / len(texts), 4),
+            "fp32_mean_ms": round(timings["fp32"] / len(texts), 2),
+            "int8_mean_ms": round(timings["int8"] / len(texts), 2),
+            "speedup": round(timings["fp32"] / timings["int8"], 2) if timings["int8"] else None,
+            "ok": exact_match >= min_exact_match,
+        })
+    return results
+
+
+class SimulatedWebSocket:
+    """Stand-in for a Starlette WebSocket that records delivery times"""
+
+    def __init__(self, delay, on_receive):
+        self.delay = delay
+        self.on_receive = on_receive
+        self.closed = False
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.on_receive()
+
+    async def close(self, code=1000):
+        self.closed = True
+
+
+def bench_ws_fanout(client_counts=(1000, 5000, 10000), slow_fraction=0.01, businesses=10, messages=20):
+    """Fan-out latency of ConnectionManager with thousands of simulated sockets, some of them stalled"""
+    import main
+
+    # Stalled clients hit the send timeout quickly instead of after the production default
+    main.WS_SEND_TIMEOUT = 0.5
+
+    async def run(client_count):
+        manager = main.ConnectionManager()
+        business_ids = [f"bench_business_{i}" for i in range(businesses)]
+        slow_count = int(client_count * slow_fraction)
+        fast_per_business = {business_id: 0 for business_id in business_ids}
+        received = {"count": 0}
+        done = asyncio.Event()
+        expected = {"count": 0}
+
+        def on_receive():
+            received["count"] += 1
+            if received["count"] >= expected["count"]:
+                done.set()
+
+        sockets = []
+        for i in range(client_count):
+            business_id = business_ids[i % businesses]
+            slow = i < slow_count
+            socket = SimulatedWebSocket(3600 if slow else 0, on_receive)
+            manager.register(socket, business_id)
+            sockets.append(socket)
+            if not slow:
+                fast_per_business[business_id] += 1
+
+        # Each message only reaches its own business's fast clients
+        expected["count"] = sum(fast_per_business[business_ids[n % businesses]] for n in range(messages))
+        broadcast_ms = []
+        started = time.perf_counter()
+        for n in range(messages):
+            business_id = business_ids[n % businesses]
+            call_started = time.perf_counter()
+            await manager.broadcast({"type": "review_analyzed", "data": {"id": n, "business_id": business_id}}, business_id)
+            broadcast_ms.append((time.perf_counter() - call_started) * 1000)
+        await asyncio.wait_for(done.wait(), timeout=30)
+        delivered_ms = (time.perf_counter() - started) * 1000
+
+        await asyncio.sleep(main.WS_SEND_TIMEOUT + 0.2)
+        disconnected = sum(1 for socket in sockets if socket.closed)
+        for socket in list(manager.clients):
+            manager.disconnect(socket)
+        return {
+            "benchmark": "ws_fanout",
+            "clients": client_count,
+            "slow_clients": slow_count,
+            "messages": messages,
+            "broadcast_p50_ms": round(_percentile(broadcast_ms, 50), 3),
+            "broadcast_p99_ms": round(_percentile(broadcast_ms, 99), 3),
+            "all_delivered_ms": round(delivered_ms, 2),
+            "slow_disconnected": disconnected,
+            "ok": disconnected == slow_count,
+        }
+
+    return [asyncio.run(run(count)) for count in client_counts]
+
+
+class StubEngine:
+    """Stand-in for UniversalSentimentAnalyzer with a fixed cost per generate call and per review"""
+
+    def __init__(self, name, call_ms=5.0, review_ms=2.0, aspects=2):
+        from ml_engine import MicroBatcher
+
+        self.name = name
+        self.model = True
+        self.model_version = "stub"
+        self.call_ms = call_ms
+        self.review_ms = review_ms
+        self.aspects = aspects
+        self.batcher = MicroBatcher(self)
+
+    def analyze(self, text, profile=None):
+        return self.batcher.submit(text, profile).result()
+
+    def analyze_batch(self, texts, profile=None):
+        time.sleep((self.call_ms + self.review_ms * len(texts)) / 1000)
+        return [
+            {
+                "original_review": text,
+                "analysis": [
+                    {"term": "", "category": f"category_{(len(text) + i) % 5}", "sentiment": SENTIMENTS[(len(text) + i) % 3]}
+                    for i in range(self.aspects)
+                ],
+            }
+            for text in texts
+        ]
+
+    def close(self):
+        self.batcher.stop()
+
+
+def install_stub_engines():
+    """Serve every model type from a StubEngine (no torch models needed)"""
+    import main
+    from ml_engine import ENGINES, MODEL_FOLDERS
+
+    main.inference_client = None
+    for model_type in MODEL_FOLDERS:
+        ENGINES[model_type] = StubEngine(model_type)
+
+
+def _latency_summary(latencies_ms):
+    return {
+        "p50_ms": round(_percentile(latencies_ms, 50), 2),
+        "p99_ms": round(_percentile(latencies_ms, 99), 2),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 2),
+    }
+
+
+def _fixture_texts(model_type, count):
+    with open(PARITY_FIXTURES, encoding="utf-8") as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+    texts = [sample["text"] for sample in samples if sample["model"] == model_type] or ["The service was great but the room was noisy."]
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+def bench_analyze_latency(engine_kind="stub", requests=64, concurrency_levels=(1, 8), profiles=None):
+    """analyze() latency through the micro-batcher per generation profile and caller concurrency"""
+    from concurrent.futures import ThreadPoolExecutor
+    from inference_cache import InferenceCache
+    from ml_engine import GENERATION_PROFILES, MODEL_FOLDERS, get_engine
+
+    results = []
+    for model_type in sorted(MODEL_FOLDERS):
+        engine = get_engine(model_type)
+        if engine is None or not engine.model:
+            results.append({"benchmark": "analyze_latency", "model": model_type, "skipped": "model missing"})
+            continue
+        # Every call must reach generate: no memory or database cache hits
+        engine.cache = InferenceCache(capacity=0, persist=False)
+        texts = _fixture_texts(model_type, requests)
+
+        for profile in profiles or sorted(GENERATION_PROFILES):
+            for concurrency in concurrency_levels:
+                def timed(text):
+                    started = time.perf_counter()
+                    engine.analyze(text, profile)
+                    return (time.perf_counter() - started) * 1000
+
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    latencies = list(pool.map(timed, texts))
+                elapsed = time.perf_counter() - started
+                results.append({
+                    "benchmark": "analyze_latency",
+                    "engine": engine_kind,
+                    "model": model_type,
+                    "profile": profile,
+                    "concurrency": concurrency,
+                    "requests": len(texts),
+                    "reviews_per_s": round(len(texts) / elapsed, 2),
+                    **_latency_summary(latencies),
+                })
+    return results
+
+
+class LocalServer:
+    """Serves main.app with uvicorn on a free local port (lifespan off: no queue workers or model warm-up)"""
+
+    def __init__(self):
+        import uvicorn
+        import main
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(
+            main.app, host="127.0.0.1", port=self.port, lifespan="off", log_level="warning"
+        ))
+        self._thread = None
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self._thread.join()
+
+    def request(self, method, path, body=None, content_type="application/json"):
+        """Send one request on this thread's keep-alive connection; returns (status, ms)"""
+        import http.client
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        headers = {"Content-Type": content_type} if body is not None else {}
+        started = time.perf_counter()
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status, (time.perf_counter() - started) * 1000
+
+
+def bench_ingest(requests=2000, concurrency=16, bulk_size=10000):
+    """Ingestion throughput of POST /api/reviews and POST /api/reviews/bulk"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    business_id = f"bench_{uuid.uuid4().hex[:8]}"
+    results = []
+    try:
+        with LocalServer() as server:
+            def post(i):
+                body = json.dumps({
+                    "business_id": business_id, "text": f"Ingested review {i} " + "lorem ipsum " * 10,
+                    "customer_name": "Bench", "rating": 4, "model_type": "amazon",
+                })
+                return server.request("POST", "/api/reviews", body.encode())
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                responses = list(pool.map(post, range(requests)))
+            elapsed = time.perf_counter() - started
+            errors = sum(1 for status, _ in responses if status != 200)
+            results.append({
+                "benchmark": "ingest",
+                "endpoint": "POST /api/reviews",
+                "requests": requests,
+                "concurrency": concurrency,
+                "requests_per_s": round(requests / elapsed, 2),
+                "errors": errors,
+                "ok": errors == 0,
+                **_latency_summary([ms for _, ms in responses]),
+            })
+
+            items = [{
+                "business_id": business_id, "text": f"Bulk review {i}", "rating": 3, "model_type": "amazon",
+            } for i in range(bulk_size)]
+            # Values COPY must keep distinct from NULL: empty text/name, CSV metacharacters, "\N"
+            edge_cases = [
+                {"text": "", "customer_name": ""},
+                {"text": 'Quoted "text", with commas\nand a newline', "customer_name": None},
+                {"text": "\\N", "customer_name": "\\N"},
+            ]
+            for item, overrides in zip(items, edge_cases):
+                item.update(overrides)
+            payload = "\n".join(json.dumps(item) for item in items).encode()
+            status, ms = server.request("POST", "/api/reviews/bulk", payload, "application/x-ndjson")
+            results.append({
+                "benchmark": "ingest",
+                "endpoint": "POST /api/reviews/bulk",
+                "reviews": bulk_size,
+                "ms": round(ms, 2),
+                "reviews_per_s": round(bulk_size / (ms / 1000), 2),
+                "ok": status == 200,
+            })
+    finally:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                delete_business_reviews(cursor, business_id)
+    return results
+
+
+def bench_queue_drain(reviews=2000, timeout=600):
+    """Time for a ReviewWorkerPool to analyze and persist a backlog of pending reviews"""
+    import main
+
+    business_id = f"bench_{uuid.uuid4().hex[:8]}"
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            seed_raw_reviews(cursor, business_id, reviews, pending=reviews)
+    workers = main.ReviewWorkerPool(
+        main.REVIEW_WORKERS, main.REVIEW_CLAIM_BATCH, main.REVIEW_LEASE_SECONDS, 1.0, main.REVIEW_QUEUE_NOTIFY
+    )
+    try:
+        started = time.perf_counter()
+        workers.start()
+        remaining = reviews
+        while remaining and time.perf_counter() - started < timeout:
+            time.sleep(0.1)
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute('''
+                        SELECT COUNT(*) FROM raw_reviews
+                        WHERE business_id = %s AND status IN ('pending', 'processing')
+                    ''', (business_id,))
+                    remaining = cursor.fetchone()[0]
+        elapsed = time.perf_counter() - started
+    finally:
+        workers.stop()
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                delete_business_reviews(cursor, business_id)
+    return [{
+        "benchmark": "queue_drain",
+        "reviews": reviews,
+        "workers": main.REVIEW_WORKERS,
+        "claim_batch": main.REVIEW_CLAIM_BATCH,
+        "seconds": round(elapsed, 2),
+        "reviews_per_s": round((reviews - remaining) / elapsed, 2),
+        "ok": remaining == 0,
+    }]
+
+
+ENDPOINT_PATHS = [
+    ("reviews", "/api/businesses/{business_id}/reviews"),
+    ("reviews_negative", "/api/businesses/{business_id}/reviews?sentiment=negative"),
+    ("stats", "/api/businesses/{business_id}/stats"),
+    ("analytics", "/api/businesses/{business_id}/analytics?period=weekly"),
+]
+CACHED_ENDPOINTS = {"stats", "analytics"}
+
+
+def bench_endpoint_latency(scales=(10_000, 100_000, 1_000_000), requests=50, seed_chunk=50_000):
+    """p50/p99 of the dashboard read endpoints as one business grows to each scale"""
+    business_id = f"bench_{uuid.uuid4().hex[:8]}"
+    results = []
+    seeded = 0
+    try:
+        with LocalServer() as server:
+            for scale in sorted(scales):
+                # Grow the same business in chunks instead of reseeding from zero
+                while seeded < scale:
+                    count = min(seed_chunk, scale - seeded)
+                    with get_db_connection() as conn:
+                        with conn.cursor() as cursor:
+                            seed_reviews(cursor, business_id, count, 30, start=seeded, rebuild=False)
+                    seeded += count
+                with get_db_connection() as conn:
+                    with conn.cursor() as cursor:
+                        rollups.rebuild_rollups(cursor, business_id)
+                        cursor.execute("ANALYZE reviews, aspect_sentiments, review_rollups")
+
+                for name, template in ENDPOINT_PATHS:
+                    path = template.format(business_id=business_id)
+                    server.request("GET", path)
+                    # "cold" recomputes every response; "warm" is served by the response cache
+                    for cache in ("cold", "warm") if name in CACHED_ENDPOINTS else ("cold",):
+                        timings = []
+                        for _ in range(requests):
+                            if cache == "cold":
+                                RESPONSE_CACHE.clear()
+                            timings.append(server.request("GET", path))
+                        errors = sum(1 for status, _ in timings if status != 200)
+                        results.append({
+                            "benchmark": "endpoint_latency",
+                            "endpoint": name,
+                            "cache": cache,
+                            "reviews": scale,
+                            "requests": requests,
+                            "errors": errors,
+                            "ok": errors == 0,
+                            **_latency_summary([ms for _, ms in timings]),
+                        })
+    finally:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                delete_business_reviews(cursor, business_id)
+    return results
+
+
+def _free_port():
+    import socket
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_status(url, status, deadline):
+    """Poll url until it answers with `status`; False on timeout"""
+    import urllib.error
+    import urllib.request
+
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == status:
+                    return True
+        except urllib.error.HTTPError as e:
+            if e.code == status:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def bench_cold_start(timeout=600):
+    """Import time of main.py, and process start to first served request and to ML readiness"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = subprocess.run([sys.executable, "-c", (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import main\n"
+        "print(json.dumps({'import_s': time.perf_counter() - started, 'torch': 'torch' in sys.modules}))"
+    )], capture_output=True, text=True, cwd=here)
+    imported = json.loads(probe.stdout.strip().splitlines()[-1]) if probe.returncode == 0 else {}
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        served = _wait_for_status(base + "/api/demo-accounts", 200, deadline)
+        first_response_s = time.perf_counter() - started
+        ready = served and _wait_for_status(base + "/health", 200, deadline)
+        ready_s = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return [{
+        "benchmark": "cold_start",
+        "import_main_s": round(imported["import_s"], 3) if imported else None,
+        "torch_imported_by_main": imported.get("torch"),
+        "first_response_s": round(first_response_s, 3) if served else None,
+        "ml_ready_s": round(ready_s, 3) if ready else None,
+        "warmup": os.getenv("ML_WARMUP", ""),
+        "ok": bool(imported) and not imported.get("torch") and served and ready,
+    }]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# name -> (runner, needs database)
+BENCHMARKS = {
+    "analytics-queries": (lambda args: bench_analytics_queries([(100, 5), (1000, 20), (10000, 50)]), True),
+    "index-usage": (lambda args: bench_index_usage(), True),
+    "generation-profiles": (_run_generation_profiles, False),
+    "quantization-parity": (lambda args: bench_quantization_parity(args.sample or PARITY_FIXTURES), False),
+    "ws-fanout": (lambda args: bench_ws_fanout(), False),
+    "analyze-latency": (lambda args: bench_analyze_latency(args.engine), False),
+    "ingest": (lambda args: bench_ingest(), True),
+    "queue-drain": (lambda args: bench_queue_drain(), True),
+    "endpoint-latency": (lambda args: bench_endpoint_latency(args.scales), True),
+    "cold-start": (lambda args: bench_cold_start(), True),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review backend benchmarks")
+    parser.add_argument("benchmarks", nargs="*", choices=sorted(BENCHMARKS), help="benchmarks to run (default: all)")
+    parser.add_argument("--sample", help="labelled JSONL sample for generation-profiles")
+    parser.add_argument("--engine", choices=["stub", "real"], default="stub",
+                        help="ML engine for analyze-latency and queue-drain (default: stub)")
+    parser.add_argument("--scales", type=lambda value: [int(n) for n in value.split(",")],
+                        default=[10_000, 100_000, 1_000_000], help="review counts for endpoint-latency")
+    parser.add_argument("--output", help="also write all results, with commit and timestamp, to this JSON file")
+    args = parser.parse_args()
+
+    selected = args.benchmarks or sorted(BENCHMARKS)
+    if any(BENCHMARKS[name][1] for name in selected):
+        init_db()
+    if args.engine == "stub":
+        install_stub_engines()
+    failed = False
+    collected = []
+    for name in selected:
+        for result in BENCHMARKS[name][0](args):
+            print(json.dumps(result))
+            collected.append(result)
+            failed = failed or result.get("ok") is False
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": _git_commit(),
+                "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "benchmarks": selected,
+                "engine": args.engine,
+                "results": collected,
+            }, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
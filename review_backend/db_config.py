@@ -3,10 +3,14 @@ PostgreSQL database configuration and connection management
 """
 import os
 import psycopg2
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 from contextlib import contextmanager
+import threading
+import time
+from metrics import Histogram
+import tracing
 
 # Load environment variables
 load_dotenv()
@@ -20,24 +24,66 @@ DATABASE_CONFIG = {
     'password': os.getenv('DB_PASSWORD', '1')
 }
 
+# Connection pool sizing (shared by API handlers and review workers)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
 # Connection pool (initialized on first use)
 _connection_pool = None
+_pool_lock = threading.Lock()
 
 
-def init_connection_pool(minconn=1, maxconn=10):
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """Thread-safe pool that waits for a free connection instead of raising PoolError"""
+    
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._available = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+    
+    def getconn(self, key=None):
+        started = time.perf_counter()
+        self._available.acquire()
+        try:
+            conn = super().getconn(key)
+        except Exception:
+            self._available.release()
+            raise
+        POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+        return conn
+    
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._available.release()
+
+
+def init_connection_pool(minconn=None, maxconn=None):
     """Initialize PostgreSQL connection pool"""
     global _connection_pool
     if _connection_pool is None:
-        try:
-            _connection_pool = SimpleConnectionPool(
-                minconn=minconn,
-                maxconn=maxconn,
-                **DATABASE_CONFIG
-            )
-            print(f"INFO: PostgreSQL connection pool initialized (max: {maxconn})")
-        except Exception as e:
-            print(f"ERROR: Failed to initialize connection pool: {e}")
-            raise
+        with _pool_lock:
+            if _connection_pool is None:
+                minconn = minconn or DB_POOL_MIN
+                maxconn = maxconn or DB_POOL_MAX
+                try:
+                    # Statement spans are only recorded when tracing is enabled
+                    extra = {"cursor_factory": tracing.TracingCursor} if tracing.enabled() else {}
+                    _connection_pool = BlockingConnectionPool(
+                        minconn=minconn,
+                        maxconn=maxconn,
+                        **DATABASE_CONFIG,
+                        **extra
+                    )
+                    print(f"INFO: PostgreSQL connection pool initialized (max: {maxconn})")
+                except Exception as e:
+                    print(f"ERROR: Failed to initialize connection pool: {e}")
+                    raise
     return _connection_pool
 
 
@@ -57,12 +103,22 @@ def get_db_connection():
         yield conn
         conn.commit()
     except Exception as e:
-        if conn:
+        if conn and not conn.closed:
             conn.rollback()
         raise
     finally:
         if conn:
-            pool.putconn(conn)
+            # Drop broken connections instead of handing them to the next caller
+            pool.putconn(conn, close=bool(conn.closed))
+
+
+def close_connection_pool():
+    """Close all pooled connections (called on shutdown)"""
+    global _connection_pool
+    with _pool_lock:
+        if _connection_pool is not None:
+            _connection_pool.closeall()
+            _connection_pool = None
 
 
 def get_direct_connection():
@@ -0,0 +1,137 @@
+"""
+Content-hash cache for ML analysis results
+Keyed by (model name, model version, hash of the normalized review text):
+an in-process LRU in front of the persistent inference_cache table.
+"""
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from psycopg2.extras import Json, execute_values
+
+INFERENCE_CACHE_SIZE = int(os.getenv('INFERENCE_CACHE_SIZE', '10000'))
+INFERENCE_CACHE_PERSIST = os.getenv('INFERENCE_CACHE_PERSIST', '1') == '1'
+
+CREATE_CACHE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS inference_cache (
+        model_name VARCHAR(255) NOT NULL,
+        model_version VARCHAR(64) NOT NULL,
+        text_hash CHAR(64) NOT NULL,
+        analysis JSONB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (model_name, model_version, text_hash)
+    )
+'''
+
+
+def normalize_text(text):
+    """Unicode- and whitespace-normalize review text (case is kept: the models are case-sensitive)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class InferenceCache:
+    """LRU of analysis results backed by PostgreSQL, with hit/miss counters"""
+
+    def __init__(self, capacity=INFERENCE_CACHE_SIZE, persist=INFERENCE_CACHE_PERSIST):
+        self.capacity = capacity
+        self.persist = persist
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, analysis):
+        self._entries[key] = analysis
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get_many(self, model_name, model_version, texts):
+        """Return {index: analysis} for every text with a cached result"""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        missing = {}
+        with self._lock:
+            for index, digest in enumerate(hashes):
+                key = (model_name, model_version, digest)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[index] = self._entries[key]
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(digest, []).append(index)
+
+        if missing and self.persist:
+            for digest, analysis in self._load(model_name, model_version, list(missing)).items():
+                with self._lock:
+                    self._remember((model_name, model_version, digest), analysis)
+                    self.db_hits += len(missing[digest])
+                for index in missing.pop(digest):
+                    found[index] = analysis
+
+        with self._lock:
+            self.misses += sum(len(indexes) for indexes in missing.values())
+        return found
+
+    def put_many(self, model_name, model_version, texts, analyses):
+        """Store analysis results for the given texts"""
+        rows = {}
+        with self._lock:
+            for text, analysis in zip(texts, analyses):
+                digest = text_hash(text)
+                self._remember((model_name, model_version, digest), analysis)
+                rows[digest] = analysis
+        if rows and self.persist:
+            self._store(model_name, model_version, rows)
+
+    def _load(self, model_name, model_version, digests):
+        from db_config import get_db_connection
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute('''
+                        SELECT text_hash, analysis FROM inference_cache
+                        WHERE model_name = %s AND model_version = %s AND text_hash = ANY(%s)
+                    ''', (model_name, model_version, digests))
+                    return dict(cursor.fetchall())
+        except Exception as e:
+            print(f"Warning: Inference cache lookup failed: {e}")
+            return {}
+
+    def _store(self, model_name, model_version, rows):
+        from db_config import get_db_connection
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, '''
+                        INSERT INTO inference_cache (model_name, model_version, text_hash, analysis)
+                        VALUES %s
+                        ON CONFLICT DO NOTHING
+                    ''', [
+                        (model_name, model_version, digest, Json(analysis))
+                        for digest, analysis in rows.items()
+                    ])
+        except Exception as e:
+            print(f"Warning: Inference cache store failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "capacity": self.capacity,
+                "memoryHits": self.memory_hits,
+                "dbHits": self.db_hits,
+                "misses": self.misses,
+                "hitRate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by all engines in this process
+INFERENCE_CACHE = InferenceCache()
@@ -0,0 +1,207 @@
+"""
+Out-of-process inference service shared by all API workers
+The service owns the UniversalSentimentAnalyzer engines and answers batched jobs over a
+Unix socket. With --workers N it pre-forks N processes that accept on the same socket.
+With --preload the ML_WARMUP engines (all when unset, at most ML_MAX_RESIDENT_ENGINES) are
+loaded before forking, so the workers share the weight pages copy-on-write instead of each
+loading its own copy.
+Usage:
+    python inference_service.py --socket /tmp/review_inference.sock --workers 2 --preload
+API processes use it when INFERENCE_SOCKET is set (see InferenceClient).
+
+Wire format: every message is a 4-byte big-endian length followed by a UTF-8 JSON object.
+    {"op": "analyze", "model_type": "hotel", "texts": [...], "profile": null}
+        -> {"results": [{"original_review": ..., "analysis": [...]}, ...]}
+    {"op": "status"} -> {"engines": {...}, "ready": true}
+Errors come back as {"error": "..."}.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', '')
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '120'))
+
+_HEADER = struct.Struct(">I")
+
+
+def send_message(sock, message):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("Inference socket closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    """Serves requests from one client connection until it closes"""
+
+    def handle(self):
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                response = handle_request(request)
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            send_message(self.request, response)
+
+
+def handle_request(request):
+    from ml_engine import get_engine, engine_status, engines_ready
+
+    op = request.get("op", "analyze")
+    if op == "status":
+        return {"engines": engine_status(), "ready": engines_ready()}
+    if op != "analyze":
+        return {"error": f"Unknown op: {op}"}
+
+    texts = request.get("texts", [])
+    engine = get_engine(request.get("model_type"))
+    if engine is None or not engine.model:
+        return {"results": [{"original_review": text, "analysis": []} for text in texts]}
+
+    profile = request.get("profile")
+    if len(texts) == 1:
+        # Single reviews from many API processes are coalesced by the engine's micro-batcher
+        return {"results": [engine.analyze(texts[0], profile)]}
+    return {"results": engine.analyze_batch(texts, profile)}
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path, workers=1, preload=False):
+    """Bind the socket, pre-fork `workers` processes and serve until interrupted"""
+    from ml_engine import load_all_models, preload_model_types, start_warmup
+    from metrics import log_memory
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = InferenceServer(socket_path, InferenceRequestHandler)
+    print(f"INFO: Inference service listening on {socket_path} ({workers} worker(s))")
+    if preload:
+        # Inference never writes the weights, so forked workers keep sharing these pages
+        load_all_models(preload_model_types())
+
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            children = []
+            break
+        children.append(pid)
+
+    if preload:
+        log_memory("at worker start")
+    else:
+        start_warmup()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        if children and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class InferenceClient:
+    """Client for the inference service; one socket per calling thread"""
+
+    def __init__(self, socket_path=INFERENCE_SOCKET, timeout=INFERENCE_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def request(self, message):
+        # One retry on a fresh connection covers service restarts between calls. A timeout is
+        # not retried: the service may still be generating the first copy of the batch.
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+            except OSError:
+                if attempt:
+                    raise
+                continue
+            try:
+                send_message(sock, message)
+                response = recv_message(sock)
+                break
+            except ConnectionError:
+                self._reset()
+                if attempt:
+                    raise
+            except OSError:
+                # socket.timeout included; the connection is out of sync with the service
+                self._reset()
+                raise
+        if "error" in response:
+            raise RuntimeError(f"Inference service error: {response['error']}")
+        return response
+
+    def analyze(self, model_type, text, profile=None):
+        return self.analyze_batch(model_type, [text], profile)[0]
+
+    def analyze_batch(self, model_type, texts, profile=None):
+        return self.request({"op": "analyze", "model_type": model_type, "texts": texts, "profile": profile})["results"]
+
+    def status(self):
+        return self.request({"op": "status"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review inference service")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET or "/tmp/review_inference.sock")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('INFERENCE_WORKERS', '1')))
+    parser.add_argument("--preload", action="store_true", default=os.getenv('INFERENCE_PRELOAD', '0') == '1',
+                        help="load the ML_WARMUP engines before forking workers (shared weight pages)")
+    args = parser.parse_args()
+    serve(args.socket, args.workers, args.preload)
@@ -2,9 +2,11 @@
 FastAPI backend for business review analysis system
 Optimized version with WebSocket support, async processing, and PostgreSQL
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional, Set
 from contextlib import asynccontextmanager
 import psycopg2
@@ -16,11 +18,60 @@ import time
 import asyncio
 import uuid
 import json
-from ml_engine import load_all_models, get_engine
-from db_config import get_db_connection, get_direct_connection, create_database_if_not_exists
+import os
+import base64
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from ml_engine import get_engine, start_warmup, engine_status, engines_ready
+from inference_cache import INFERENCE_CACHE
+from inference_service import INFERENCE_SOCKET, InferenceClient
+from pg_events import WS_EVENTS_BACKEND, PgEventListener, QueueWakeListener, notify
+import rollups
+import migrations
+import results_writer
+import metrics
+import tracing
+from response_cache import (
+    RESPONSE_CACHE, RESPONSE_CACHE_BACKEND, CACHE_REQUESTS, InvalidationListener, if_none_match
+)
+from metrics import Counter, Gauge, Histogram
+from starlette.concurrency import run_in_threadpool
+from db_config import get_db_connection, get_direct_connection, create_database_if_not_exists, init_connection_pool, close_connection_pool
 
 # Database configuration handled by db_config.py
 
+# Review queue workers: concurrent batches per process, rows claimed per batch, lease before a
+# 'processing' row is considered abandoned, and the idle poll interval.
+# With REVIEW_QUEUE_NOTIFY inserts wake the workers through LISTEN/NOTIFY and the poll is
+# only a safety net (expired leases, missed notifications).
+REVIEW_WORKERS = int(os.getenv('REVIEW_WORKERS', '4'))
+REVIEW_CLAIM_BATCH = int(os.getenv('REVIEW_CLAIM_BATCH', '5'))
+REVIEW_LEASE_SECONDS = int(os.getenv('REVIEW_LEASE_SECONDS', '300'))
+REVIEW_QUEUE_NOTIFY = os.getenv('REVIEW_QUEUE_NOTIFY', '1') == '1'
+REVIEW_POLL_SECONDS = float(os.getenv('REVIEW_POLL_SECONDS', '60' if REVIEW_QUEUE_NOTIFY else '5'))
+
+# When INFERENCE_SOCKET is set, models live in inference_service.py instead of this process
+inference_client = InferenceClient(INFERENCE_SOCKET) if INFERENCE_SOCKET else None
+
+# Reviews list: default and maximum page size
+REVIEWS_PAGE_SIZE = int(os.getenv('REVIEWS_PAGE_SIZE', '100'))
+REVIEWS_MAX_PAGE_SIZE = int(os.getenv('REVIEWS_MAX_PAGE_SIZE', '1000'))
+
+# WebSocket events: coalescing window and max per-event items in a coalesced frame
+BROADCAST_COALESCE_MS = float(os.getenv('BROADCAST_COALESCE_MS', '100'))
+BROADCAST_MAX_ITEMS = int(os.getenv('BROADCAST_MAX_ITEMS', '50'))
+
+# WebSocket clients: queued frames per client, per-frame send timeout (seconds) and what to
+# do when a client's queue is full ("drop" the frame or "disconnect" the client)
+WS_SEND_QUEUE_SIZE = int(os.getenv('WS_SEND_QUEUE_SIZE', '100'))
+WS_SEND_TIMEOUT = float(os.getenv('WS_SEND_TIMEOUT', '5'))
+WS_SLOW_CONSUMER_POLICY = os.getenv('WS_SLOW_CONSUMER_POLICY', 'disconnect')
+
+# Bulk ingestion: rows per COPY chunk and maximum reviews per request
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '1000'))
+BULK_MAX_REVIEWS = int(os.getenv('BULK_MAX_REVIEWS', '100000'))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,13 +83,23 @@ async def lifespan(app: FastAPI):
     
 
     init_db()
+    init_connection_pool()
+    broadcast_bus.start()
+    if event_listener:
+        event_listener.start()
+    if cache_listener:
+        cache_listener.start()
     
 
-    load_all_models()
+    # Engines load on first use; ML_WARMUP preloads selected ones in the background
+    if inference_client:
+        print(f"INFO: Using inference service at {INFERENCE_SOCKET}")
+    else:
+        start_warmup()
     
 
-    print("Starting background review processor...")
-    threading.Thread(target=background_review_processor, daemon=True).start()
+    print(f"Starting background review processor ({REVIEW_WORKERS} workers)...")
+    review_workers.start()
     
     print("="*60)
     print("INFO: API READY!")
@@ -48,6 +109,21 @@ async def lifespan(app: FastAPI):
     
 
     print("Shutting down...")
+    review_workers.stop()
+    if event_listener:
+        event_listener.stop()
+    if cache_listener:
+        cache_listener.stop()
+    await broadcast_bus.stop()
+    close_connection_pool()
+
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse whose serialization shows up as a span in request traces"""
+    
+    def render(self, content) -> bytes:
+        with tracing.span("serialize"):
+            return super().render(content)
 
 
 # Initialize FastAPI app with lifespan
@@ -55,7 +131,8 @@ app = FastAPI(
     title="Business Review Analysis API",
     description="AI-powered review analysis with real-time updates",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TracedJSONResponse
 )
 
 # CORS middleware for web and mobile access
@@ -65,7 +142,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"])
+QUEUE_BACKLOG = Gauge("raw_reviews_backlog", "raw_reviews rows waiting for or under analysis", ["status"])
+REVIEWS_PROCESSED = Counter("reviews_processed_total", "Reviews finished by the queue workers", ["outcome"])
+WS_CONNECTIONS = Gauge("ws_connections", "Open WebSocket connections per business", ["business_id"])
+WS_BROADCAST_SECONDS = Histogram(
+    "ws_broadcast_seconds", "Time to fan one event out to every client queue of a business",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
 )
+WS_DELIVERY_SECONDS = Histogram("ws_delivery_seconds", "Time from enqueueing a frame to a completed send")
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    sampled = tracing.should_trace(forced=request.headers.get("x-trace") == "1")
+    with tracing.trace(f"{request.method} {request.url.path}", active=sampled) as current:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route templates, not raw paths, keep the label set bounded
+            route = request.scope.get("route")
+            route_path = route.path if route else "unmatched"
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=request.method, route=route_path, status=status
+            )
+            if current:
+                current.attributes.update(route=route_path, status=status)
 
 
 # Business accounts (email, password, name, type, business_id)
@@ -91,48 +201,230 @@ BUSINESS_ACCOUNTS = {
 }
 
 
+class ClientConnection:
+    """One WebSocket client with a bounded send queue drained by its own sender task"""
+    
+    def __init__(self, websocket: WebSocket, business_id: str):
+        self.websocket = websocket
+        self.business_id = business_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.sender = None
+        # Set once a slow-consumer close is scheduled, so it is scheduled only once
+        self.closing = False
+    
+    async def send_loop(self, manager: "ConnectionManager"):
+        try:
+            while True:
+                text, enqueued_at = await self.queue.get()
+                await asyncio.wait_for(self.websocket.send_text(text), WS_SEND_TIMEOUT)
+                WS_DELIVERY_SECONDS.observe(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Timeout or broken socket: this client is gone or too slow
+            print(f"WebSocket: dropping client for business_id={self.business_id}: {type(e).__name__}")
+            await manager.close(self.websocket)
+
+
 class ConnectionManager:
-    """WebSocket connection manager for real-time updates"""
+    """WebSocket connection manager for real-time updates, indexed by business_id"""
     
     def __init__(self):
 
-        self.connections: dict[WebSocket, str] = {}
+        self.connections: dict[str, dict[WebSocket, ClientConnection]] = {}
+        self.clients: dict[WebSocket, ClientConnection] = {}
+        # PgEventListener: LISTEN only on businesses with local clients
+        self.listener = None
+        # The loop only holds weak references to tasks: keep pending closes alive
+        self._close_tasks: Set[asyncio.Task] = set()
     
     async def connect(self, websocket: WebSocket, business_id: str):
         await websocket.accept()
-        self.connections[websocket] = business_id
-        print(f"INFO: WebSocket connected for business_id={business_id}. Total: {len(self.connections)}")
+        self.register(websocket, business_id)
+        print(f"INFO: WebSocket connected for business_id={business_id}. Total: {len(self.clients)}")
+    
+    def register(self, websocket: WebSocket, business_id: str) -> ClientConnection:
+        """Index an accepted socket and start its sender task"""
+        client = ClientConnection(websocket, business_id)
+        if business_id not in self.connections and self.listener:
+            self.listener.subscribe(business_id)
+        self.connections.setdefault(business_id, {})[websocket] = client
+        self.clients[websocket] = client
+        client.sender = asyncio.create_task(client.send_loop(self))
+        return client
     
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.connections:
-            del self.connections[websocket]
-        print(f"INFO: WebSocket disconnected. Total: {len(self.connections)}")
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        subscribers = self.connections.get(client.business_id)
+        if subscribers is not None:
+            subscribers.pop(websocket, None)
+            if not subscribers:
+                del self.connections[client.business_id]
+                if self.listener:
+                    self.listener.unsubscribe(client.business_id)
+        if client.sender and client.sender is not asyncio.current_task():
+            client.sender.cancel()
+        print(f"INFO: WebSocket disconnected. Total: {len(self.clients)}")
+    
+    async def close(self, websocket: WebSocket, code: int = 1013):
+        """Disconnect and close a client (1013 = try again later, used for slow consumers)"""
+        self.disconnect(websocket)
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+    
+    def send_text(self, websocket: WebSocket, text: str):
+        """Queue a frame for one client"""
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, text)
+    
+    def _enqueue(self, client: ClientConnection, text: str) -> bool:
+        try:
+            client.queue.put_nowait((text, time.perf_counter()))
+            return True
+        except asyncio.QueueFull:
+            client.dropped += 1
+            if WS_SLOW_CONSUMER_POLICY == "disconnect" and not client.closing:
+                client.closing = True
+                task = asyncio.create_task(self.close(client.websocket))
+                self._close_tasks.add(task)
+                task.add_done_callback(self._close_tasks.discard)
+            return False
     
     async def broadcast(self, message: dict, business_id: str):
         """Broadcast message to clients of a specific business"""
-        if not self.connections:
+        subscribers = self.connections.get(business_id)
+        if not subscribers:
             return
         
-        disconnected = []
-        sent_count = 0
-        for connection, conn_business_id in self.connections.items():
 
-            if conn_business_id == business_id:
-                try:
-                    await connection.send_json(message)
+        # Serialized once; each client's sender task delivers it concurrently
+        with WS_BROADCAST_SECONDS.time():
+            text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+            sent_count = 0
+            for client in list(subscribers.values()):
+                if self._enqueue(client, text):
                     sent_count += 1
-                except Exception as e:
-                    print(f"Error broadcasting: {e}")
-                    disconnected.append(connection)
-        
-
-        for conn in disconnected:
-            self.disconnect(conn)
         
         print(f"WebSocket: Broadcast to {sent_count} client(s) for business_id={business_id}")
 
 
 manager = ConnectionManager()
+WS_CONNECTIONS.set_function(
+    lambda: {(business_id,): len(subscribers) for business_id, subscribers in list(manager.connections.items())}
+)
+
+
+class BroadcastBus:
+    """
+    Thread-safe event bus in front of the ConnectionManager
+    Any thread may publish; a single task on the server loop drains the queue, coalesces
+    events per (business, type) within a short window and delivers them.
+    """
+    
+    def __init__(self, connection_manager, coalesce_ms):
+        self.manager = connection_manager
+        self.coalesce = coalesce_ms / 1000.0
+        self._loop = None
+        self._queue = None
+        self._task = None
+    
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._drain())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def emit(self, message: dict, business_id: str):
+        """Send an event to every API process (NOTIFY) or only to this one (blocking; call off the loop)"""
+        self.emit_many([(message, business_id)])
+    
+    def emit_many(self, events: List[tuple]):
+        """emit() for several (message, business_id) events using one connection"""
+        if not events:
+            return
+        if WS_EVENTS_BACKEND != "postgres":
+            for message, business_id in events:
+                self.publish(message, business_id)
+            return
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    for message, business_id in events:
+                        notify(cursor, business_id, message)
+        except Exception as e:
+            # Nothing was NOTIFYed (the transaction rolled back): still reach this process's clients
+            print(f"Warning: Event publish failed, delivering locally only: {e}")
+            for message, business_id in events:
+                self.publish(message, business_id)
+    
+    def publish(self, message: dict, business_id: str):
+        """Queue an event for local delivery; safe to call from worker threads and the loop alike"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, (business_id, message))
+        except RuntimeError:
+            # Loop already shut down
+            pass
+    
+    async def _drain(self):
+        while True:
+            events = [await self._queue.get()]
+            # Let a burst accumulate, then take everything that is waiting
+            if self.coalesce > 0:
+                await asyncio.sleep(self.coalesce)
+            while not self._queue.empty():
+                events.append(self._queue.get_nowait())
+            
+            grouped = {}
+            for business_id, message in events:
+                grouped.setdefault((business_id, message.get("type")), []).append(message)
+            
+            for (business_id, _), messages in grouped.items():
+                try:
+                    await self.manager.broadcast(self._coalesce(messages), business_id)
+                except Exception as e:
+                    print(f"Warning: Broadcast failed: {e}")
+    
+    @staticmethod
+    def _coalesce(messages: List[dict]) -> dict:
+        """Merge same-type events for one business into a single frame"""
+        if len(messages) == 1:
+            return messages[0]
+        latest = messages[-1]
+        count = sum(message.get("data", {}).get("count", 1) for message in messages)
+        noun = "reviews analyzed" if latest.get("type") == "review_analyzed" else "new reviews received"
+        return {
+            "type": latest.get("type"),
+            "message": f"{count} {noun}!",
+            "data": {
+                **latest.get("data", {}),
+                "count": count,
+                "items": [message.get("data", {}) for message in messages[-BROADCAST_MAX_ITEMS:]]
+            }
+        }
+
+
+broadcast_bus = BroadcastBus(manager, BROADCAST_COALESCE_MS)
+
+# Cross-process delivery: NOTIFYed events are handed to the local bus
+event_listener = PgEventListener(broadcast_bus.publish) if WS_EVENTS_BACKEND == "postgres" else None
+manager.listener = event_listener
+cache_listener = InvalidationListener(RESPONSE_CACHE) if RESPONSE_CACHE_BACKEND == "postgres" else None
 
 
 def init_db():
@@ -221,6 +513,9 @@ def init_db():
         ''')
         
 
+        migrations.apply_migrations(cursor)
+        
+
         cursor.execute("SELECT COUNT(*) FROM businesses")
         if cursor.fetchone()[0] == 0:
             demo_businesses = [
@@ -313,75 +608,140 @@ async def get_demo_accounts():
     return accounts
 
 
-@app.get("/api/businesses/{business_id}/reviews")
-async def get_reviews(business_id: str, sentiment: Optional[str] = None, category: Optional[str] = None):
-    """Get all reviews for a business with optional sentiment and category filters"""
-    try:
-        conn = get_direct_connection()
-        cursor = conn.cursor()
-        
+def _encode_review_cursor(review_date, review_id: str) -> str:
+    """Opaque keyset cursor for the (date, id) position of the last returned review"""
+    raw = json.dumps([review_date.isoformat() if review_date else None, review_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
 
-        query = '''
-            SELECT DISTINCT r.id, r.text, a.category, a.sentiment, r.date, r.customer_name, r.rating, r.overall_sentiment
-            FROM reviews r
-            LEFT JOIN aspect_sentiments a ON r.id = a.review_id
-            WHERE r.business_id = %s
-        '''
-        params = [business_id]
-        
-        if sentiment and sentiment != "all":
-            query += " AND a.sentiment = %s"
-            params.append(sentiment.lower())
-        
-        if category:
-            query += " AND a.category = %s"
-            params.append(category)
-        
-        query += " ORDER BY r.date DESC, r.id DESC"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
 
-        reviews_dict = {}
-        for row in rows:
-            review_id, text, aspect_category, aspect_sent, date, customer, rating, overall_sent = row
-            
+def _decode_review_cursor(cursor_token: str):
+    try:
+        review_date, review_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode()))
+        return (datetime.datetime.fromisoformat(review_date) if review_date else None), review_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _review_query(business_id: str, sentiment: Optional[str], category: Optional[str], after=None, limit: Optional[int] = None):
+    """Build the reviews list query with aspects aggregated per review in SQL"""
+    aspect_filter = ""
+    aspect_params = []
+    if sentiment and sentiment != "all":
+        aspect_filter += " AND a.sentiment = %s"
+        aspect_params.append(sentiment.lower())
+    if category:
+        aspect_filter += " AND a.category = %s"
+        aspect_params.append(category)
+    
 
-            if review_id not in reviews_dict:
-                reviews_dict[review_id] = {
-                    "id": review_id,
-                    "text": text,
-                    "customerName": customer or "Anonymous",
-                    "rating": rating or 0.0,
-                    "date": date,
-                    "aspects": [],
-                    "overallSentiment": overall_sent or "neutral"
-                }
-            
+    review_filter = ""
+    review_params = [business_id]
+    if aspect_filter:
+        # Only reviews with at least one matching aspect, and only the matching aspects are listed
+        review_filter += f" AND EXISTS (SELECT 1 FROM aspect_sentiments a WHERE a.review_id = r.id{aspect_filter})"
+        review_params += aspect_params
+    if after:
+        # Matches ORDER BY date DESC NULLS LAST: undated reviews come after every dated one
+        after_date, after_id = after
+        if after_date is None:
+            review_filter += " AND r.date IS NULL AND r.id < %s"
+            review_params.append(after_id)
+        else:
+            review_filter += " AND (r.date IS NULL OR (r.date, r.id) < (%s, %s))"
+            review_params += [after_date, after_id]
+    
+    query = f'''
+        SELECT r.id, r.text, r.date, r.customer_name, r.rating, r.overall_sentiment,
+               COALESCE(asp.aspects, '[]'::json)
+        FROM reviews r
+        LEFT JOIN LATERAL (
+            SELECT json_agg(json_build_object('category', a.category, 'sentiment', a.sentiment) ORDER BY a.first_id) AS aspects
+            FROM (
+                SELECT a.category, a.sentiment, MIN(a.id) AS first_id
+                FROM aspect_sentiments a
+                WHERE a.review_id = r.id AND a.category <> '' AND a.sentiment <> ''{aspect_filter}
+                GROUP BY a.category, a.sentiment
+            ) a
+        ) asp ON TRUE
+        WHERE r.business_id = %s{review_filter}
+        ORDER BY r.date DESC NULLS LAST, r.id DESC
+    '''
+    params = aspect_params + review_params
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+def _fetch_review_rows(cursor, business_id: str, sentiment: Optional[str], category: Optional[str], after=None, limit: Optional[int] = None):
+    """Fetch one page of reviews for the reviews endpoint, newest first"""
+    query, params = _review_query(business_id, sentiment, category, after, limit)
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def _review_row_to_item(row) -> dict:
+    review_id, text, date, customer, rating, overall_sent, aspects = row
+    return {
+        "id": review_id,
+        "text": text,
+        "customerName": customer or "Anonymous",
+        "rating": rating or 0.0,
+        "date": date,
+        "aspects": aspects,
+        "overallSentiment": overall_sent or "neutral"
+    }
 
 
-            if aspect_category and aspect_sent:
+def _stream_reviews_ndjson(business_id: str, sentiment: Optional[str], category: Optional[str], after, limit: Optional[int]):
+    """Yield reviews as NDJSON lines straight from a server-side cursor"""
+    query, params = _review_query(business_id, sentiment, category, after, limit)
+    # A dedicated connection: a slow client must not hold a pooled one the workers need
+    conn = get_direct_connection()
+    try:
+        with conn.cursor(name=f"reviews_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = 500
+            cursor.execute(query, params)
+            for row in cursor:
+                yield json.dumps(jsonable_encoder(_review_row_to_item(row))) + "\n"
+    finally:
+        conn.close()
 
-                should_add = True
-                if sentiment and sentiment != "all" and aspect_sent != sentiment.lower():
-                    should_add = False
-                if category and aspect_category != category:
-                    should_add = False
-                    
-                if should_add:
 
-                    aspect_key = f"{aspect_category}_{aspect_sent}"
-                    existing_keys = [f"{a['category']}_{a['sentiment']}" for a in reviews_dict[review_id]["aspects"]]
-                    if aspect_key not in existing_keys:
-                        reviews_dict[review_id]["aspects"].append({
-                            "category": aspect_category,
-                            "sentiment": aspect_sent
-                        })
+@app.get("/api/businesses/{business_id}/reviews")
+def get_reviews(
+    business_id: str,
+    response: Response,
+    sentiment: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    format: Optional[str] = "json",
+):
+    """
+    Get reviews for a business with optional sentiment and category filters
+    Pages are keyset-paginated on (date, id): pass the X-Next-Cursor header value back as `cursor`.
+    format=ndjson streams every matching review (or up to `limit`) as newline-delimited JSON.
+    """
+    after = _decode_review_cursor(cursor) if cursor else None
+    
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_reviews_ndjson(business_id, sentiment, category, after, limit),
+            media_type="application/x-ndjson"
+        )
+    
+    page_size = min(limit or REVIEWS_PAGE_SIZE, REVIEWS_MAX_PAGE_SIZE)
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as db_cursor:
+                rows = _fetch_review_rows(db_cursor, business_id, sentiment, category, after, page_size)
+        
+        if len(rows) == page_size:
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = _encode_review_cursor(last[2], last[0])
         
-        return list(reviews_dict.values())
+        return [_review_row_to_item(row) for row in rows]
     except Exception as e:
         print(f"ERROR: /reviews endpoint: {type(e).__name__}: {e}")
         import traceback
@@ -389,104 +749,94 @@ async def get_reviews(business_id: str, sentiment: Optional[str] = None, categor
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/businesses/{business_id}/stats")
-async def get_business_stats(business_id: str):
-    """Get dashboard statistics for a business"""
-    conn = get_direct_connection()
-    cursor = conn.cursor()
+def _cached_response(request: Request, endpoint: str, business_id: str, period: Optional[str], compute) -> Response:
+    """Serve from the response cache (or compute and store), answering 304 when the ETag matches"""
+    entry = RESPONSE_CACHE.get(business_id, endpoint, period)
+    result = "hit"
+    if entry is None:
+        result = "miss"
+        # Read before computing so a concurrent invalidation keeps this result out of the cache
+        generation = RESPONSE_CACHE.generation(business_id)
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                payload = compute(cursor)
+        with tracing.span("serialize"):
+            body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        entry = RESPONSE_CACHE.put(business_id, endpoint, period, generation, body)
     
+    # Clients must revalidate every time; unchanged payloads cost a 304 without a body
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if if_none_match(request.headers.get("if-none-match"), entry.etag):
+        CACHE_REQUESTS.inc(endpoint=endpoint, result="not_modified")
+        return Response(status_code=304, headers=headers)
+    CACHE_REQUESTS.inc(endpoint=endpoint, result=result)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
-    cursor.execute(
-        "SELECT COUNT(*) FROM reviews WHERE business_id = %s",
-        (business_id,)
-    )
-    total_reviews = cursor.fetchone()[0]
-    
 
-    cursor.execute(
-        "SELECT overall_sentiment FROM reviews WHERE business_id = %s",
-        (business_id,)
+@app.get("/api/businesses/{business_id}/stats")
+def get_business_stats(business_id: str, request: Request):
+    """Get dashboard statistics for a business"""
+    return _cached_response(
+        request, "stats", business_id, None,
+        lambda cursor: _compute_business_stats(cursor, business_id)
     )
-    rows = cursor.fetchall()
-    
 
-    positive = negative = neutral = 0
-    for (overall_sentiment,) in rows:
-        sent = (overall_sentiment or "neutral").lower()
-        if sent == "positive":
-            positive += 1
-        elif sent == "negative":
-            negative += 1
-        else:
-            neutral += 1
-    
 
-    trend_data = []
+def _compute_business_stats(cursor, business_id: str):
+    """Build the dashboard stats payload from the daily rollups"""
     today = datetime.date.today()
-    for i in range(6, -1, -1):
-        target_date = today - timedelta(days=i)
-        date_str = target_date.strftime("%Y-%m-%d")
-        
-        cursor.execute(
-            "SELECT COUNT(*) FROM reviews WHERE business_id = %s AND DATE(date) = %s AND overall_sentiment = 'positive'",
-            (business_id, date_str)
-        )
-        daily_positive = cursor.fetchone()[0]
-        trend_data.append(daily_positive)
+    trend_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
     
-    cursor.close()
-    conn.close()
+    total_reviews, positive, negative, trend = rollups.fetch_overall_counts(
+        cursor, business_id, trend_days=trend_days
+    )
     
     return {
         "totalReviews": total_reviews,
         "positive": positive,
         "negative": negative,
-        "neutral": neutral,
-        "trend": trend_data
+        "neutral": total_reviews - positive - negative,
+        "trend": trend
     }
 
 
+def _insert_raw_review(data: ReviewInput) -> int:
+    """Queue a review in raw_reviews and return its id"""
+    timestamp = datetime.datetime.now()
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                INSERT INTO raw_reviews 
+                (business_id, review_text, customer_name, rating, date, status, model_type, created_at)
+                VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s)
+                RETURNING id
+            ''', (data.business_id, data.text, data.customer_name, data.rating, timestamp, data.model_type, timestamp))
+            return cursor.fetchone()[0]
+
+
 @app.post("/api/reviews")
-async def add_review(data: ReviewInput, background_tasks: BackgroundTasks):
+async def add_review(data: ReviewInput):
     """Add a new review (queued for async processing)"""
     try:
-        conn = get_direct_connection()
-        cursor = conn.cursor()
-        
-        timestamp = datetime.datetime.now()
+        # Blocking driver call runs off the event loop
+        raw_review_id = await run_in_threadpool(_insert_raw_review, data)
         
 
-        cursor.execute('''
-            INSERT INTO raw_reviews 
-            (business_id, review_text, customer_name, rating, date, status, model_type, created_at)
-            VALUES (%s, %s, %s, %s, %s, 'pending', %s, %s)
-            RETURNING id
-        ''', (data.business_id, data.text, data.customer_name, data.rating, timestamp, data.model_type, timestamp))
-        
-        raw_review_id = cursor.fetchone()[0]
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-
-        try:
-            await manager.broadcast({
-                "type": "new_review",
-                "message": "New review received!",
-                "data": {
-                    "id": raw_review_id,
-                    "business_id": data.business_id,
-                    "customer_name": data.customer_name,
-                    "rating": data.rating,
-                    "preview": data.text[:100] + "..." if len(data.text) > 100 else data.text,
-                    "status": "pending"
-                }
-            }, data.business_id)
-        except Exception as e:
-            print(f"Warning: Broadcast failed: {e}")
+        await run_in_threadpool(broadcast_bus.emit, {
+            "type": "new_review",
+            "message": "New review received!",
+            "data": {
+                "id": raw_review_id,
+                "business_id": data.business_id,
+                "customer_name": data.customer_name,
+                "rating": data.rating,
+                "preview": data.text[:100] + "..." if len(data.text) > 100 else data.text,
+                "status": "pending"
+            }
+        }, data.business_id)
         
 
-        background_tasks.add_task(process_review, raw_review_id)
+        review_workers.wake()
         
         return {
             "success": True,
@@ -498,36 +848,151 @@ async def add_review(data: ReviewInput, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail=f"Error adding review: {str(e)}")
 
 
-@app.get("/api/businesses/{business_id}/analytics")
-async def get_analytics(business_id: str, period: Optional[str] = "all"):
-    """Get AI-generated analytics for a business"""
-    conn = get_direct_connection()
-    cursor = conn.cursor()
+# Accepted bulk upload formats, keyed by content type
+BULK_JSON_TYPES = ("application/json",)
+BULK_NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BULK_CSV_TYPES = ("text/csv", "application/csv")
+
+
+def _parse_bulk_payload(body: bytes, content_type: str, filename: str = "") -> List[dict]:
+    """Decode a JSON array, NDJSON or CSV payload into raw review dicts"""
+    text = body.decode("utf-8-sig")
+    
+    if content_type in BULK_CSV_TYPES or filename.endswith(".csv"):
+        # Empty CSV cells fall back to the ReviewInput defaults
+        return [
+            {key: value for key, value in row.items() if value not in ("", None)}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
     
+    if content_type in BULK_NDJSON_TYPES or filename.endswith((".ndjson", ".jsonl")):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of reviews")
+    return items
+
 
-    date_filter = ""
-    params = [business_id]
+def _validate_bulk_reviews(items: List[dict]):
+    """Validate every item with ReviewInput; returns (reviews, errors)"""
+    reviews = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            reviews.append(ReviewInput.model_validate(item))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.errors(include_url=False)})
+    return reviews, errors
+
+
+def _copy_csv_row(values) -> str:
+    """One COPY csv line: None as an unquoted empty field (NULL), everything else quoted ('' stays '')"""
+    return ",".join(
+        "" if value is None else '"' + str(value).replace('"', '""') + '"' for value in values
+    ) + "\n"
+
+
+def _copy_raw_reviews(reviews: List[ReviewInput]) -> dict:
+    """COPY reviews into raw_reviews in chunks (one transaction); returns counts per business"""
+    timestamp = datetime.datetime.now()
+    counts = {}
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            for start in range(0, len(reviews), BULK_CHUNK_SIZE):
+                buffer = io.StringIO()
+                for data in reviews[start:start + BULK_CHUNK_SIZE]:
+                    buffer.write(_copy_csv_row((data.business_id, data.text, data.customer_name, data.rating,
+                                                timestamp, 'pending', data.model_type, timestamp)))
+                    counts[data.business_id] = counts.get(data.business_id, 0) + 1
+                buffer.seek(0)
+                cursor.copy_expert('''
+                    COPY raw_reviews (business_id, review_text, customer_name, rating, date, status, model_type, created_at)
+                    FROM STDIN WITH (FORMAT csv)
+                ''', buffer)
+    return counts
+
+
+@app.post("/api/reviews/bulk")
+async def add_reviews_bulk(request: Request):
+    """
+    Add many reviews at once (queued for async processing)
+    Accepts a JSON array, NDJSON or CSV body, or a multipart upload in a `file` field.
+    The whole batch is rejected with 422 if any item fails validation.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    filename = ""
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing 'file' upload")
+        body = await upload.read()
+        filename = (upload.filename or "").lower()
+        content_type = (upload.content_type or "").lower()
+    else:
+        body = await request.body()
+    
+    try:
+        items = await run_in_threadpool(_parse_bulk_payload, body, content_type, filename)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse reviews: {e}")
+    
+    if len(items) > BULK_MAX_REVIEWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_REVIEWS} reviews per request")
+    
+    reviews, errors = await run_in_threadpool(_validate_bulk_reviews, items)
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": f"{len(errors)} invalid review(s)", "errors": errors[:100]})
+    if not reviews:
+        return {"success": True, "message": "No reviews to add", "count": 0, "businesses": {}}
+    
+    try:
+        counts = await run_in_threadpool(_copy_raw_reviews, reviews)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding reviews: {str(e)}")
     
-    if period == "daily":
 
-        date_filter = " AND date >= NOW() - INTERVAL '1 day'"
-    elif period == "weekly":
+    # One coalesced notification per business for the whole batch
+    for business_id, count in counts.items():
+        await run_in_threadpool(broadcast_bus.emit, {
+            "type": "new_review",
+            "message": f"{count} new review{'s' if count > 1 else ''} received!",
+            "data": {
+                "business_id": business_id,
+                "count": count,
+                "status": "pending"
+            }
+        }, business_id)
+    
+    review_workers.wake()
+    
+    return {
+        "success": True,
+        "message": f"{len(reviews)} reviews received! Analysis in progress...",
+        "count": len(reviews),
+        "businesses": counts
+    }
+
 
-        date_filter = " AND date >= NOW() - INTERVAL '7 days'"
-    elif period == "monthly":
+@app.get("/api/businesses/{business_id}/analytics")
+def get_analytics(business_id: str, request: Request, period: Optional[str] = "all"):
+    """Get AI-generated analytics for a business"""
+    return _cached_response(
+        request, "analytics", business_id, period,
+        lambda cursor: _compute_analytics(cursor, business_id, period)
+    )
 
-        date_filter = " AND date >= NOW() - INTERVAL '30 days'"
 
+def _compute_analytics(cursor, business_id: str, period: Optional[str]):
+    """Build the analytics payload from the daily rollups plus one examples query"""
+    since = rollups.period_start(period)
     
-
-    cursor.execute(
-        f"SELECT id, text, overall_sentiment FROM reviews WHERE business_id = %s{date_filter}",
-        params
+    total_reviews, overall_positive, overall_negative, _ = rollups.fetch_overall_counts(
+        cursor, business_id, since=since
     )
-    reviews = cursor.fetchall()
     
-    if not reviews:
-        conn.close()
+    if not total_reviews:
         return {
             "totalReviews": 0,
             "topIssues": [],
@@ -539,81 +1004,56 @@ async def get_analytics(business_id: str, period: Optional[str] = "all"):
         }
     
 
-    overall_positive = overall_negative = overall_neutral = 0
-    for review_id, text, overall_sentiment in reviews:
-        sent = (overall_sentiment or "neutral").lower()
-        if sent == "positive":
-            overall_positive += 1
-        elif sent == "negative":
-            overall_negative += 1
-        else:
-            overall_neutral += 1
-    
-
-    cursor.execute(f'''
-        SELECT a.category, a.sentiment
-        FROM aspect_sentiments a
-        JOIN reviews r ON a.review_id = r.id
-        WHERE r.business_id = %s{date_filter}
-    ''', params)
-    aspect_rows = cursor.fetchall()
-    
     category_stats = {}
-    for category, sentiment in aspect_rows:
-        if not category:
-            continue
-        if category not in category_stats:
-            category_stats[category] = {"positive": 0, "negative": 0, "neutral": 0}
-        
-        sent = sentiment.lower() if sentiment else "neutral"
-        if sent in category_stats[category]:
-            category_stats[category][sent] += 1
+    negative_review_counts = {}
+    for category, positive, negative, neutral, negative_reviews in rollups.fetch_category_counts(cursor, business_id, since=since):
+        category_stats[category] = {"positive": positive, "negative": negative, "neutral": neutral}
+        negative_review_counts[category] = negative_reviews
     
 
-    top_issues = []
-    for category, stats in sorted(category_stats.items(), key=lambda x: x[1]["negative"], reverse=True)[:5]:
-        if stats["negative"] > 0:
-
-            cursor.execute(f'''
-                SELECT COUNT(DISTINCT r.id)
-                FROM reviews r
-                JOIN aspect_sentiments a ON r.id = a.review_id
-                WHERE r.business_id = %s AND a.category = %s AND a.sentiment = 'negative'{date_filter}
-            ''', [business_id, category])
-            unique_review_count = cursor.fetchone()[0]
-            
+    issue_categories = [
+        category
+        for category, stats in sorted(category_stats.items(), key=lambda x: x[1]["negative"], reverse=True)[:5]
+        if stats["negative"] > 0
+    ]
+    
 
-            cursor.execute(f'''
-                SELECT r.id, r.customer_name, r.text, r.date 
-                FROM reviews r
+    # Newest 5 negative reviews for every issue category in one pass
+    examples_by_category = {category: [] for category in issue_categories}
+    if issue_categories:
+        date_filter = " AND r.date >= %s" if since else ""
+        cursor.execute(f'''
+            SELECT category, text
+            FROM (
+                SELECT neg.category, r.text,
+                       ROW_NUMBER() OVER (PARTITION BY neg.category ORDER BY r.date DESC) AS rn
+                FROM (
+                    SELECT DISTINCT a.review_id, a.category
+                    FROM aspect_sentiments a
+                    WHERE a.category = ANY(%s) AND a.sentiment = 'negative'
+                ) neg
+                JOIN reviews r ON r.id = neg.review_id
                 WHERE r.business_id = %s{date_filter}
-                AND r.id IN (
-                    SELECT DISTINCT a.review_id 
-                    FROM aspect_sentiments a 
-                    WHERE a.category = %s AND a.sentiment = 'negative'
-                )
-                ORDER BY r.date DESC
-                LIMIT 5
-            ''', [business_id, category])
-            example_reviews = cursor.fetchall()
-            
-            examples = []
-            seen_review_ids = set()
-            for (review_id, customer_name, review_text, review_date) in example_reviews:
-                if review_id not in seen_review_ids:
-                    seen_review_ids.add(review_id)
-                    examples.append({
-                        "term": category,
-                        "review_text": review_text[:100] + "..." if len(review_text) > 100 else review_text
-                    })
-            
-            top_issues.append({
-                "category": category,
-                "count": unique_review_count,
-                "severity": "high" if unique_review_count > 10 else "medium" if unique_review_count > 5 else "low",
-                "examples": examples
+            ) ranked
+            WHERE rn <= 5
+            ORDER BY category, rn
+        ''', [issue_categories, business_id] + ([since] if since else []))
+        for category, review_text in cursor.fetchall():
+            examples_by_category[category].append({
+                "term": category,
+                "review_text": review_text[:100] + "..." if len(review_text) > 100 else review_text
             })
     
+    top_issues = []
+    for category in issue_categories:
+        unique_review_count = negative_review_counts[category]
+        top_issues.append({
+            "category": category,
+            "count": unique_review_count,
+            "severity": "high" if unique_review_count > 10 else "medium" if unique_review_count > 5 else "low",
+            "examples": examples_by_category[category]
+        })
+    
 
     recommendations = []
     for issue in top_issues[:3]:
@@ -633,20 +1073,67 @@ async def get_analytics(business_id: str, period: Optional[str] = "all"):
             "total": total
         })
     
-    cursor.close()
-    conn.close()
-    
     return {
-        "totalReviews": len(reviews),
+        "totalReviews": total_reviews,
         "positiveCount": overall_positive,
         "negativeCount": overall_negative,
-        "neutralCount": overall_neutral,
+        "neutralCount": total_reviews - overall_positive - overall_negative,
         "topIssues": top_issues,
         "recommendations": recommendations,
         "categoryBreakdown": category_breakdown
     }
 
 
+@app.get("/health")
+async def health(response: Response):
+    """Readiness signal: 503 until background warm-up has finished, with per-engine state"""
+    if inference_client:
+        try:
+            status = await run_in_threadpool(inference_client.status)
+        except Exception as e:
+            response.status_code = 503
+            return {"status": "inference_unavailable", "ready": False, "engines": {}, "error": str(e)}
+        ready, engines = status["ready"], status["engines"]
+    else:
+        ready, engines = engines_ready(), engine_status()
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ok" if ready else "warming_up",
+        "ready": ready,
+        "engines": engines,
+        # This API process only; the inference service logs its own at startup
+        "memoryMB": {kind: round(value / 2**20, 1) for kind, value in metrics.process_memory().items()}
+    }
+
+
+def _queue_backlog():
+    # Both statuses are covered by partial indexes, so this stays cheap on a large table
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute('''
+                SELECT 'pending', COUNT(*) FROM raw_reviews WHERE status = 'pending'
+                UNION ALL
+                SELECT 'processing', COUNT(*) FROM raw_reviews WHERE status = 'processing'
+            ''')
+            return {(status,): count for status, count in cursor.fetchall()}
+
+
+QUEUE_BACKLOG.set_function(_queue_backlog)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/inference-cache/stats")
+async def get_inference_cache_stats():
+    """Hit/miss counters of the ML inference result cache"""
+    return INFERENCE_CACHE.stats()
+
+
 @app.websocket("/ws/{business_id}")
 async def websocket_endpoint(websocket: WebSocket, business_id: str):
     """WebSocket endpoint for real-time updates"""
@@ -655,133 +1142,231 @@ async def websocket_endpoint(websocket: WebSocket, business_id: str):
         while True:
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
+                manager.send_text(websocket, "pong")
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 
-def process_review(raw_review_id: int):
-    """Process a review through ML model (runs in background)"""
-    try:
-        conn = get_direct_connection()
-        cursor = conn.cursor()
-        
+def _analyze_texts(model_type: str, texts: List[str]) -> List[list]:
+    """Run ABSA on a batch of reviews, in-process or through the inference service"""
+    if inference_client:
+        with tracing.span("inference_rpc", model_type, batch=len(texts)):
+            results = inference_client.analyze_batch(model_type, texts)
+        return [result.get("analysis", []) for result in results]
+    engine = get_engine(model_type)
+    if engine and engine.model:
+        return [result.get("analysis", []) for result in engine.analyze_batch(texts)]
+    return [[] for _ in texts]
 
-        cursor.execute('''
-            SELECT business_id, review_text, customer_name, rating, date, model_type
-            FROM raw_reviews 
-            WHERE id = %s AND status = 'pending'
-        ''', (raw_review_id,))
-        
-        row = cursor.fetchone()
-        if not row:
-            cursor.close()
-            conn.close()
-            return
-        
-        business_id, review_text, customer_name, rating, review_date, model_type = row
-        
 
-        engine = get_engine(model_type)
-        if engine and engine.model:
-            result = engine.analyze(review_text)
-            analysis_items = result.get("analysis", [])
-        else:
-            analysis_items = []
-        
+def _review_event(result: dict) -> dict:
+    text = result["text"]
+    return {
+        "type": "review_analyzed",
+        "message": "Review analysis completed!",
+        "data": {
+            "id": result["raw_review_id"],
+            "business_id": result["business_id"],
+            "customer_name": result["customer_name"],
+            "rating": result["rating"],
+            "preview": text[:100] + "..." if len(text) > 100 else text,
+            "aspect_count": len(result["analysis"]),
+            "sentiment": result["sentiment"]
+        }
+    }
 
-        dominant_sentiment = "neutral"
-        if analysis_items:
-            sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-            for item in analysis_items:
-                sent = item.get("sentiment", "neutral").lower()
-                if sent in sentiment_counts:
-                    sentiment_counts[sent] += 1
-            
-            max_sent = max(sentiment_counts, key=sentiment_counts.get)
-            if sentiment_counts[max_sent] > 0:
-                dominant_sentiment = max_sent
-        
 
-        review_id = str(uuid.uuid4())
-        cursor.execute('''
-            INSERT INTO reviews 
-            (id, business_id, text, customer_name, rating, date, overall_sentiment)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ''', (review_id, business_id, review_text, customer_name, rating, review_date, dominant_sentiment))
-        
+def _write_results(results: List[dict]) -> tuple:
+    """Persist results in one transaction; on failure retry one by one. Returns (written, failed ids)"""
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                written = results_writer.write_results(cursor, results)
+                # Other API processes drop their cached dashboards once this commits
+                RESPONSE_CACHE.notify_invalidation(cursor, {result["business_id"] for result in written})
+        RESPONSE_CACHE.invalidate({result["business_id"] for result in written})
+        return written, []
+    except Exception as e:
+        if len(results) == 1:
+            print(f"ERROR: Saving review {results[0]['raw_review_id']}: {str(e)}")
+            return [], [results[0]["raw_review_id"]]
+        print(f"ERROR: Saving batch of {len(results)} reviews, retrying individually: {str(e)}")
+    
+    written, failed = [], []
+    for result in results:
+        done, bad = _write_results([result])
+        written.extend(done)
+        failed.extend(bad)
+    return written, failed
+
 
-        if analysis_items:
-            for item in analysis_items:
+def process_reviews(raw_review_ids: List[int]):
+    """Analyze a batch of claimed reviews and persist them together (runs on a review worker)"""
+    failed = []
+    try:
+        # Pooled connections are only held around the queries, never during inference
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
                 cursor.execute('''
-                    INSERT INTO aspect_sentiments 
-                    (review_id, aspect_term, category, sentiment)
-                    VALUES (%s, %s, %s, %s)
-                ''', (review_id, item.get("term", ""), item.get("category", "general"), item.get("sentiment", "neutral")))
+                    SELECT id, business_id, review_text, customer_name, rating, date, model_type
+                    FROM raw_reviews 
+                    WHERE id = ANY(%s) AND status = 'processing'
+                    ORDER BY id
+                ''', (list(raw_review_ids),))
+                rows = cursor.fetchall()
         
-
-        cursor.execute("UPDATE raw_reviews SET status = 'completed' WHERE id = %s", (raw_review_id,))
-        conn.commit()
-        cursor.close()
-        conn.close()
+        by_model = {}
+        for row in rows:
+            by_model.setdefault(row[6], []).append(row)
         
-        print(f"INFO: Review {raw_review_id} processed: {len(analysis_items)} aspects found")
+        results = []
+        for model_type, model_rows in by_model.items():
+            try:
+                analyses = _analyze_texts(model_type, [row[2] for row in model_rows])
+            except Exception as e:
+                print(f"ERROR: Analyzing {len(model_rows)} {model_type} review(s): {str(e)}")
+                failed.extend(row[0] for row in model_rows)
+                continue
+            for (raw_id, business_id, text, customer_name, rating, review_date, _), items in zip(model_rows, analyses):
+                results.append({
+                    "raw_review_id": raw_id,
+                    "business_id": business_id,
+                    "text": text,
+                    "customer_name": customer_name,
+                    "rating": rating,
+                    "date": review_date,
+                    "sentiment": results_writer.dominant_sentiment(items),
+                    "analysis": items
+                })
         
-
-        asyncio.run(manager.broadcast({
-            "type": "review_analyzed",
-            "message": "Review analysis completed!",
-            "data": {
-                "id": raw_review_id,
-                "business_id": business_id,
-                "customer_name": customer_name,
-                "rating": rating,
-                "preview": review_text[:100] + "..." if len(review_text) > 100 else review_text,
-                "aspect_count": len(analysis_items),
-                "sentiment": dominant_sentiment
-            }
-        }, business_id))
+        written, write_failed = _write_results(results) if results else ([], [])
+        failed.extend(write_failed)
+        REVIEWS_PROCESSED.inc(len(written), outcome="completed")
+        if written:
+            print(f"INFO: {len(written)} review(s) processed: {sum(len(r['analysis']) for r in written)} aspects found")
+        
+        # Events go out only after the results are committed
+        broadcast_bus.emit_many([(_review_event(result), result["business_id"]) for result in written])
         
     except Exception as e:
-        print(f"ERROR: Processing review {raw_review_id}: {str(e)}")
+        print(f"ERROR: Processing reviews {list(raw_review_ids)}: {str(e)}")
+        failed = list(raw_review_ids)
+    
+    if failed:
+        REVIEWS_PROCESSED.inc(len(failed), outcome="failed")
         try:
-            conn = get_direct_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE raw_reviews SET status = 'failed' WHERE id = %s", (raw_review_id,))
-            conn.commit()
-            cursor.close()
-            conn.close()
-        except:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    results_writer.mark_failed(cursor, failed)
+        except Exception:
             pass
 
 
-def background_review_processor():
-    """Background thread to process pending reviews"""
-    while True:
-        try:
-            conn = get_direct_connection()
-            cursor = conn.cursor()
-            
+# Params: (lease_seconds, limit)
+CLAIM_REVIEWS_SQL = '''
+    UPDATE raw_reviews
+    SET status = 'processing', claimed_at = NOW()
+    WHERE id IN (
+        SELECT id FROM raw_reviews
+        WHERE status = 'pending'
+           OR (status = 'processing' AND claimed_at < NOW() - make_interval(secs => %s))
+        ORDER BY created_at ASC
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+'''
 
-            cursor.execute('''
-                SELECT id FROM raw_reviews 
-                WHERE status = 'pending' 
-                ORDER BY created_at ASC 
-                LIMIT 5
-            ''')
-            pending = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            
-            if pending:
-                for (raw_id,) in pending:
-                    threading.Thread(target=process_review, args=(raw_id,), daemon=True).start()
-            
-            time.sleep(5)
-            
-        except Exception as e:
-            print(f"Background processor error: {str(e)}")
-            time.sleep(5)
+
+class ReviewWorkerPool:
+    """Bounded worker pool that claims pending raw_reviews atomically and processes them"""
+    
+    def __init__(self, concurrency, claim_batch, lease_seconds, poll_seconds, use_notify=True, ready=None):
+        self.concurrency = concurrency
+        self.claim_batch = claim_batch
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        # Claims wait for ready() (model warm-up) so leases are not held while models load
+        self.ready = ready
+        # One dedicated LISTEN connection per process; claims still go through the pool
+        self.listener = QueueWakeListener(self.wake) if use_notify else None
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+    
+    def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="review-worker")
+        threading.Thread(target=self._run, daemon=True).start()
+        if self.listener:
+            self.listener.start()
+    
+    def stop(self):
+        if self.listener:
+            self.listener.stop()
+        self._stopped.set()
+        self._wakeup.set()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+    
+    def wake(self):
+        """Claim new work immediately instead of waiting for the next poll"""
+        self._wakeup.set()
+    
+    def claim(self, limit: int) -> List[int]:
+        """Atomically mark up to `limit` pending (or lease-expired) reviews as processing"""
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CLAIM_REVIEWS_SQL, (self.lease_seconds, limit))
+                return [row[0] for row in cursor.fetchall()]
+    
+    def _free_slots(self) -> int:
+        with self._lock:
+            return self.concurrency - self._in_flight
+    
+    def _process(self, raw_review_ids: List[int]):
+        try:
+            # Batches are traced like requests, so slow inference lands in the same log
+            with tracing.trace(f"process_reviews[{len(raw_review_ids)}]", active=tracing.should_trace()):
+                process_reviews(raw_review_ids)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._wakeup.set()
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            if self.ready and not self.ready():
+                self._wakeup.wait(0.5)
+                continue
+            try:
+                # Only claim when a worker is free so leases are never held by queued work;
+                # each claim is analyzed and written as one batch
+                claimed = self.claim(self.claim_batch) if self._free_slots() > 0 else []
+                
+                if claimed:
+                    with self._lock:
+                        self._in_flight += 1
+                    self._executor.submit(self._process, claimed)
+                
+                # A full claim means more rows may be waiting; otherwise sleep until woken
+                if len(claimed) == self.claim_batch:
+                    continue
+                self._wakeup.wait(self.poll_seconds)
+                
+            except Exception as e:
+                print(f"Background processor error: {str(e)}")
+                time.sleep(min(self.poll_seconds, 5))
+
+
+review_workers = ReviewWorkerPool(
+    REVIEW_WORKERS, REVIEW_CLAIM_BATCH, REVIEW_LEASE_SECONDS, REVIEW_POLL_SECONDS, REVIEW_QUEUE_NOTIFY,
+    ready=None if inference_client else engines_ready
+)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+Versioned schema migrations applied on top of the baseline tables created by init_db
+Each migration runs once, in version order, and is recorded in schema_migrations.
+Steps are SQL strings or callables taking a cursor.
+Usage:
+    python migrations.py          # apply pending migrations
+    python migrations.py status   # list applied/pending versions
+"""
+import sys
+import rollups
+import inference_cache
+from pg_events import REVIEW_QUEUE_CHANNEL
+
+# Serializes concurrent startups (several API processes migrating at once)
+MIGRATION_LOCK_ID = 727_001
+
+
+def _backfill_rollups(cursor):
+    rollups.rebuild_rollups(cursor)
+
+
+MIGRATIONS = [
+    (1, "raw_reviews claim lease", [
+        "ALTER TABLE raw_reviews ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP",
+    ]),
+    (2, "review_rollups counters", [
+        rollups.CREATE_ROLLUP_TABLE,
+        _backfill_rollups,
+    ]),
+    (3, "hot path indexes", [
+        # Review lists, stats date ranges and period filters: newest first per business
+        "CREATE INDEX IF NOT EXISTS idx_reviews_business_date ON reviews (business_id, date DESC, id DESC)",
+        # Aspect lookups per review (joins) and per category/sentiment (filters, top issue examples)
+        "CREATE INDEX IF NOT EXISTS idx_aspects_review ON aspect_sentiments (review_id)",
+        "CREATE INDEX IF NOT EXISTS idx_aspects_category_sentiment ON aspect_sentiments (category, sentiment, review_id)",
+        # Queue claims only ever look at pending rows and expired processing leases
+        "CREATE INDEX IF NOT EXISTS idx_raw_reviews_pending ON raw_reviews (created_at) WHERE status = 'pending'",
+        "CREATE INDEX IF NOT EXISTS idx_raw_reviews_processing ON raw_reviews (claimed_at) WHERE status = 'processing'",
+        # Rollup reads filter on business and category before the day range
+        "CREATE INDEX IF NOT EXISTS idx_rollups_business_category_day ON review_rollups (business_id, category, day)",
+    ]),
+    (4, "inference result cache", [
+        inference_cache.CREATE_CACHE_TABLE,
+    ]),
+    (5, "raw_reviews insert notification", [
+        f'''
+            CREATE OR REPLACE FUNCTION notify_raw_reviews_pending() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{REVIEW_QUEUE_CHANNEL}', '');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        ''',
+        "DROP TRIGGER IF EXISTS raw_reviews_pending_notify ON raw_reviews",
+        # Statement-level: one wake-up per INSERT/COPY, however many rows it adds
+        '''
+            CREATE TRIGGER raw_reviews_pending_notify
+            AFTER INSERT ON raw_reviews
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_raw_reviews_pending()
+        ''',
+    ]),
+    (6, "idempotent review results", [
+        # Links each analyzed review to its queue row; NULL for reviews written before this
+        "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS raw_review_id INTEGER",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_reviews_raw_review_id ON reviews (raw_review_id)",
+    ]),
+    (7, "review list index with undated reviews last", [
+        # Review lists order by date DESC NULLS LAST so keyset pages can reach undated reviews
+        "DROP INDEX IF EXISTS idx_reviews_business_date",
+        "CREATE INDEX IF NOT EXISTS idx_reviews_business_date ON reviews (business_id, date DESC NULLS LAST, id DESC)",
+    ]),
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(cursor):
+    _ensure_migrations_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(cursor):
+    """Apply pending migrations inside the caller's transaction; returns applied versions"""
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+    done = applied_versions(cursor)
+
+    applied = []
+    for version, name, steps in MIGRATIONS:
+        if version in done:
+            continue
+        for step in steps:
+            if callable(step):
+                step(cursor)
+            else:
+                cursor.execute(step)
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (version, name)
+        )
+        print(f"INFO: Applied migration {version}: {name}")
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    from db_config import get_db_connection
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            if len(sys.argv) > 1 and sys.argv[1] == "status":
+                done = applied_versions(cursor)
+                for version, name, _ in MIGRATIONS:
+                    state = "applied" if version in done else "pending"
+                    print(f"{version:>4}  {state:<8} {name}")
+            else:
+                applied = apply_migrations(cursor)
+                print(f"INFO: {len(applied)} migration(s) applied")
@@ -1,60 +1,246 @@
 """
 Optimized ML Engine for sentiment analysis using trained models
 Based on Ahsen's optimized implementation with GPU support and efficient generation
+torch and transformers are imported on first engine load, not with this module, so
+importing it (and main.py) stays fast.
 """
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, GenerationConfig
 import os
+import hashlib
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from inference_cache import INFERENCE_CACHE
+from metrics import Counter, Histogram, log_memory
+import tracing
+
+# Micro-batching: wait up to ML_BATCH_WAIT_MS for up to ML_BATCH_SIZE reviews per generate call
+ML_BATCH_SIZE = int(os.getenv('ML_BATCH_SIZE', '8'))
+ML_BATCH_WAIT_MS = float(os.getenv('ML_BATCH_WAIT_MS', '20'))
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+INFERENCE_STAGE_SECONDS = Histogram(
+    "ml_inference_stage_seconds", "Time per generate batch by stage (tokenize, generate, parse)",
+    ["model", "stage"]
+)
+INFERENCE_BATCH_REVIEWS = Histogram(
+    "ml_inference_batch_reviews", "Reviews per generate call", ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+INFERENCE_REVIEWS = Counter("ml_inference_reviews_total", "Reviews run through generate", ["model"])
+
+# Named generation strategies; "constrained" restricts output tokens to the model's
+# category/sentiment vocabulary (see _load_categories)
+GENERATION_PROFILES = {
+    "fast": {
+        "max_new_tokens": 32,
+        "num_beams": 1,
+        "do_sample": False,
+        "repetition_penalty": 1.5,
+    },
+    "accurate": {
+        "max_length": 128,
+        "num_beams": 5,
+        "early_stopping": True,
+        "repetition_penalty": 2.5,
+        "length_penalty": 1.0,
+    },
+    "constrained": {
+        "max_new_tokens": 48,
+        "num_beams": 3,
+        "early_stopping": True,
+        "repetition_penalty": 2.5,
+        "constrained": True,
+    },
+}
+
+# Default profile for every model; ML_GENERATION_PROFILE_<MODEL FOLDER> overrides per model
+ML_GENERATION_PROFILE = os.getenv('ML_GENERATION_PROFILE', 'accurate')
+
+# Opt-in CPU mode: dynamic int8 quantization of Linear layers plus explicit torch threading
+ML_CPU_OPTIMIZED = os.getenv('ML_CPU_OPTIMIZED', '0') == '1'
+ML_INTRA_OP_THREADS = int(os.getenv('ML_INTRA_OP_THREADS', '0'))
+ML_INTER_OP_THREADS = int(os.getenv('ML_INTER_OP_THREADS', '0'))
+
+# "mmap": CPU engines use a memory-mapped copy of their weights (see export_mmap_weights),
+# so every process on the host shares the same physical pages; "private" loads a copy
+ML_WEIGHTS_MODE = os.getenv('ML_WEIGHTS_MODE', 'private')
+MMAP_WEIGHTS_FILE = "weights.mmap.pt"
+
+_threads_configured = False
+_threads_lock = threading.Lock()
+
+
+def configure_cpu_threads():
+    """Apply ML_INTRA_OP_THREADS / ML_INTER_OP_THREADS once per process (0 keeps torch's default)"""
+    import torch
+
+    global _threads_configured
+    with _threads_lock:
+        if _threads_configured:
+            return
+        if ML_INTRA_OP_THREADS > 0:
+            torch.set_num_threads(ML_INTRA_OP_THREADS)
+        if ML_INTER_OP_THREADS > 0:
+            try:
+                torch.set_num_interop_threads(ML_INTER_OP_THREADS)
+            except RuntimeError as e:
+                # Only allowed before torch starts any inter-op parallel work
+                print(f"Warning: Could not set inter-op threads: {e}")
+        _threads_configured = True
+        print(f"INFO: torch threads: intra-op={torch.get_num_threads()}, inter-op={torch.get_num_interop_threads()}")
 
 
 class UniversalSentimentAnalyzer:
     """High-performance sentiment analyzer with GPU support and optimized generation"""
     
-    def __init__(self, model_folder_name):
+    def __init__(self, model_folder_name, cpu_optimized=None):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         model_path = os.path.join(base_path, model_folder_name)
+        self.name = model_folder_name
+        self.cache = INFERENCE_CACHE
+        self.default_profile = os.getenv(f'ML_GENERATION_PROFILE_{model_folder_name.upper()}', ML_GENERATION_PROFILE)
+        if self.default_profile not in GENERATION_PROFILES:
+            print(f"Warning: {model_folder_name}: unknown generation profile {self.default_profile!r}, using 'accurate'")
+            self.default_profile = "accurate"
+        self.categories = _load_categories(model_path, model_folder_name)
+        if GENERATION_PROFILES[self.default_profile].get("constrained") and not self.categories:
+            print(f"Warning: {model_folder_name}: profile {self.default_profile!r} has no categories "
+                  f"(set ML_CATEGORIES_{model_folder_name.upper()} or add categories.txt); decoding unconstrained")
+        self._generation_configs = {}
+        self._allowed_token_ids = None
+        # One generate at a time per model: concurrent calls only oversubscribe the cores
+        self._generate_lock = threading.Lock()
         
 
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Loading: {model_folder_name} on {self.device}...")
+        self.cpu_optimized = (ML_CPU_OPTIMIZED if cpu_optimized is None else cpu_optimized) and self.device == "cpu"
+        # Quantized weights can decode differently, so they get their own cache entries
+        self.model_version = _model_version(model_path) + ("-int8" if self.cpu_optimized else "")
+        print(f"Loading: {model_folder_name} on {self.device}{' (int8)' if self.cpu_optimized else ''}...")
         
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_path).to(self.device)
+            self.model = None
+            if ML_WEIGHTS_MODE == "mmap" and self.device == "cpu":
+                self.model = _load_mmap_model(model_path)
+            if self.model is None:
+                self.model = AutoModelForSeq2SeqLM.from_pretrained(model_path).to(self.device)
             self.model.eval()
+            if self.cpu_optimized:
+                configure_cpu_threads()
+                if ML_WEIGHTS_MODE == "mmap":
+                    print(f"Warning: {model_folder_name}: int8 weights are private to this process")
+                self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
             print(f"INFO: Model Ready: {model_folder_name}")
         except Exception as e:
             print(f"ERROR: {model_folder_name} could not be loaded. Path: {model_path}")
             print(f"ERROR: {e}")
             self.model = None
 
-    def analyze(self, review_text):
+        self.batcher = MicroBatcher(self)
+
+    def analyze(self, review_text, profile=None):
         """Analyze review and extract aspect-sentiment pairs with optimized generation"""
         if not self.model:
             return {"original_review": review_text, "analysis": []}
 
+        # Concurrent callers are coalesced into one batch; cached texts skip generate there
+        return self.batcher.submit(review_text, profile or self.default_profile).result()
+
+    def analyze_batch(self, texts, profile=None):
+        """Analyze several reviews with a single padded forward pass"""
+        if not texts:
+            return []
+        if not self.model:
+            return [{"original_review": text, "analysis": []} for text in texts]
 
-        input_text = "absa: " + review_text
-        inputs = self.tokenizer(input_text, return_tensors="pt").input_ids.to(self.device)
+        profile = profile or self.default_profile
+        # Results depend on the decoding strategy, so the profile is part of the cache version
+        cache_version = f"{self.model_version}:{profile}"
+
+        # Only texts without a cached result go through generate
+        analyses = self.cache.get_many(self.name, cache_version, texts)
+        pending = [index for index in range(len(texts)) if index not in analyses]
+        if pending:
+            generated = self._generate([texts[index] for index in pending], profile)
+            self.cache.put_many(self.name, cache_version, [texts[index] for index in pending], generated)
+            analyses.update(zip(pending, generated))
         
+        return [
+            {"original_review": text, "analysis": analyses[index]}
+            for index, text in enumerate(texts)
+        ]
+
+    def generation_config(self, profile):
+        """GenerationConfig for a named profile (built once per engine)"""
+        if profile not in self._generation_configs:
+            from transformers import GenerationConfig
+
+            if profile not in GENERATION_PROFILES:
+                raise ValueError(f"Unknown generation profile: {profile}")
+            settings = {k: v for k, v in GENERATION_PROFILES[profile].items() if k != "constrained"}
+            self._generation_configs[profile] = GenerationConfig(
+                **settings,
+                eos_token_id=self.tokenizer.eos_token_id,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+        return self._generation_configs[profile]
+
+    def _prefix_allowed_tokens(self):
+        """prefix_allowed_tokens_fn limiting output to category, sentiment and separator tokens"""
+        if not self.categories:
+            return None
+        if self._allowed_token_ids is None:
+            vocabulary = ", ".join(f"{cat}: {sent}" for cat in self.categories for sent in SENTIMENTS) + "; "
+            allowed = set(self.tokenizer(vocabulary, add_special_tokens=False).input_ids)
+            allowed.update({self.tokenizer.eos_token_id, self.tokenizer.pad_token_id})
+            self._allowed_token_ids = sorted(token for token in allowed if token is not None)
+        allowed_ids = self._allowed_token_ids
+        return lambda batch_id, input_ids: allowed_ids
 
-        generation_config = GenerationConfig(
-            max_length=128,
-            num_beams=5,
-            early_stopping=True,
-            repetition_penalty=2.5,
-            length_penalty=1.0,
-            eos_token_id=self.tokenizer.eos_token_id,
-            pad_token_id=self.tokenizer.pad_token_id,
-        )
-
-        with torch.no_grad():
-            outputs = self.model.generate(inputs, generation_config=generation_config)
+    def _generate(self, texts, profile=None):
+        """Run one padded generate call and return the parsed analysis for each text"""
+        import torch
+
+        profile = profile or self.default_profile
+        generation_config = self.generation_config(profile)
+        constraint = self._prefix_allowed_tokens() if GENERATION_PROFILES[profile].get("constrained") else None
+
+        input_texts = ["absa: " + text for text in texts]
+        with INFERENCE_STAGE_SECONDS.time(model=self.name, stage="tokenize"):
+            inputs = self.tokenizer(input_texts, return_tensors="pt", padding=True).to(self.device)
+
+        with self._generate_lock, torch.no_grad():
+            with INFERENCE_STAGE_SECONDS.time(model=self.name, stage="generate"), \
+                    tracing.span("generate", self.name, batch=len(texts), profile=profile):
+                outputs = self.model.generate(
+                    input_ids=inputs.input_ids,
+                    attention_mask=inputs.attention_mask,
+                    generation_config=generation_config,
+                    prefix_allowed_tokens_fn=constraint,
+                )
         
-        prediction = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+        with INFERENCE_STAGE_SECONDS.time(model=self.name, stage="parse"):
+            predictions = self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            parsed = [self._parse_prediction(prediction) for prediction in predictions]
         
+        INFERENCE_BATCH_REVIEWS.observe(len(texts), model=self.name)
+        INFERENCE_REVIEWS.inc(len(texts), model=self.name)
+        return parsed
 
+    def close(self):
+        """Release the batcher thread (the model is freed once no caller holds the engine)"""
+        self.batcher.stop()
+
+    @staticmethod
+    def _parse_prediction(prediction):
+        """Parse generated "category: sentiment" pairs into unique analysis items"""
         results = []
         seen = set()
 
@@ -84,31 +270,242 @@ class UniversalSentimentAnalyzer:
                 except:
                     continue
         
-        return {"original_review": review_text, "analysis": results}
+        return results
+
+
+def _load_categories(model_path, model_folder_name):
+    """Known aspect categories from ML_CATEGORIES_<MODEL FOLDER> or <model>/categories.txt"""
+    configured = os.getenv(f'ML_CATEGORIES_{model_folder_name.upper()}')
+    if configured:
+        return [cat.strip() for cat in configured.split(",") if cat.strip()]
+    path = os.path.join(model_path, "categories.txt")
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return []
+
+
+def _model_version(model_path):
+    """Cheap fingerprint of a model folder (file names, sizes and mtimes)"""
+    digest = hashlib.sha256()
+    if os.path.isdir(model_path):
+        for name in sorted(os.listdir(model_path)):
+            if name == MMAP_WEIGHTS_FILE:
+                # Derived from the checkpoint: exporting it does not change outputs
+                continue
+            path = os.path.join(model_path, name)
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                digest.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _load_mmap_model(model_path):
+    """
+    Build the model on the meta device and assign parameters straight from a memory-mapped
+    state dict, so weights stay backed by the (shared, read-only) page cache.
+    Returns None, after a warning, when the export is missing or unusable.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM
+
+    weights_path = os.path.join(model_path, MMAP_WEIGHTS_FILE)
+    if not os.path.isfile(weights_path):
+        print(f"Warning: {weights_path} missing (run: python ml_engine.py export-mmap); loading a private copy")
+        return None
+    try:
+        with torch.device("meta"):
+            model = AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(model_path))
+        state_dict = torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+        model.load_state_dict(state_dict, strict=False, assign=True)
+        model.tie_weights()
+        unset = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers()) if tensor.is_meta]
+        if unset:
+            raise ValueError(f"{len(unset)} tensors not in {MMAP_WEIGHTS_FILE}, e.g. {unset[0]}")
+        return model
+    except Exception as e:
+        print(f"Warning: memory-mapped load failed for {model_path}: {e}; loading a private copy")
+        return None
+
+
+def export_mmap_weights(model_type):
+    """Write <model folder>/weights.mmap.pt for ML_WEIGHTS_MODE=mmap"""
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    model_path = os.path.join(base_path, MODEL_FOLDERS[model_type])
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
+    # Contiguous tensors serialize into one storage each, which mmap=True maps in place
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    weights_path = os.path.join(model_path, MMAP_WEIGHTS_FILE)
+    torch.save(state_dict, weights_path)
+    print(f"INFO: Wrote {weights_path} ({os.path.getsize(weights_path) / 2**20:.0f} MB)")
+
+
+class MicroBatcher:
+    """Collects concurrent analyze() calls for one model and runs them as a batch"""
+    
+    def __init__(self, analyzer, max_batch_size=None, max_wait_ms=None):
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size or ML_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else ML_BATCH_WAIT_MS) / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, text, profile=None):
+        """Queue a review for the next batch and return a Future with its result"""
+        future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                # Started under the same lock as the put, so stop() cannot strand the item
+                self._queue.put((text, profile, future))
+                self._ensure_worker()
+        if closed:
+            # Evicted engine still used by an in-flight caller: run inline
+            try:
+                future.set_result(self.analyzer.analyze_batch([text], profile)[0])
+            except Exception as e:
+                future.set_exception(e)
+        return future
 
+    def stop(self):
+        """Stop the worker thread once queued requests are done"""
+        with self._lock:
+            self._closed = True
+            self._queue.put(None)
 
-# Global instances (loaded once at startup for performance)
-ENGINES = {}
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running (caller holds _lock)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
 
-def load_all_models():
-    """Load all ML models at startup for better performance"""
-    global ENGINES
+    def _collect(self):
+        """Block for the first request, then gather more until the window or size cap is hit"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Run what was collected, then stop on the next _collect
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # One generate call per profile present in the batch
+            by_profile = {}
+            for text, profile, future in batch:
+                by_profile.setdefault(profile, []).append((text, future))
+            
+            for profile, batch in by_profile.items():
+                try:
+                    results = self.analyzer.analyze_batch([text for text, _ in batch], profile)
+                    for (_, future), result in zip(batch, results):
+                        future.set_result(result)
+                except Exception as e:
+                    print(f"ERROR: Batched inference failed ({len(batch)} reviews): {e}")
+                    for _, future in batch:
+                        future.set_exception(e)
+
+
+# Model folder per business model type
+MODEL_FOLDERS = {
+    "amazon": "amazon_model",
+    "hotel": "hotel_model",
+    "coursera": "coursera_model",
+}
+
+# Engines are loaded on first use; at most ML_MAX_RESIDENT_ENGINES stay in memory (0 = no limit)
+ML_MAX_RESIDENT_ENGINES = int(os.getenv('ML_MAX_RESIDENT_ENGINES', '0'))
+# Model types to load in the background at startup ("all", a comma-separated list, or empty)
+ML_WARMUP = os.getenv('ML_WARMUP', '')
+# Engines loaded concurrently by warm-up and load_all_models (0 = all at once)
+ML_LOAD_PARALLELISM = int(os.getenv('ML_LOAD_PARALLELISM', '0'))
+
+# Resident engines, least recently used first
+ENGINES = OrderedDict()
+_engines_lock = threading.Lock()
+_loading_locks = {model_type: threading.Lock() for model_type in MODEL_FOLDERS}
+_loading = set()
+_warmup_pending = set()
+
+
+def _evict_engines():
+    """Drop least recently used engines beyond ML_MAX_RESIDENT_ENGINES (caller holds _engines_lock)"""
+    if ML_MAX_RESIDENT_ENGINES <= 0:
+        return
+    while len(ENGINES) > ML_MAX_RESIDENT_ENGINES:
+        model_type, engine = ENGINES.popitem(last=False)
+        engine.close()
+        print(f"INFO: Evicted engine: {model_type}")
+
+
+def get_engine(model_type: str):
+    """Get the ML engine for a business type, loading it on first use"""
+    if model_type not in MODEL_FOLDERS:
+        return None
+    with _engines_lock:
+        engine = ENGINES.get(model_type)
+        if engine is not None:
+            ENGINES.move_to_end(model_type)
+            return engine
+    
+
+    # Per-type lock: concurrent first requests wait for a single load
+    with _loading_locks[model_type]:
+        with _engines_lock:
+            engine = ENGINES.get(model_type)
+            if engine is not None:
+                ENGINES.move_to_end(model_type)
+                return engine
+            _loading.add(model_type)
+        try:
+            engine = UniversalSentimentAnalyzer(MODEL_FOLDERS[model_type])
+        finally:
+            with _engines_lock:
+                _loading.discard(model_type)
+        with _engines_lock:
+            ENGINES[model_type] = engine
+            _evict_engines()
+        return engine
+
+
+def load_all_models(model_types=None):
+    """Load all ML models (or just `model_types`) now instead of on first use"""
     print("="*60)
     print("LOADING ML MODELS...")
     print("="*60)
     
-    ENGINES = {
-        "amazon": UniversalSentimentAnalyzer("amazon_model"),
-        "hotel": UniversalSentimentAnalyzer("hotel_model"),
-        "coursera": UniversalSentimentAnalyzer("coursera_model")
-    }
+    started = time.perf_counter()
+    _load_engines(list(model_types or MODEL_FOLDERS))
     
 
-    loaded = [name for name, engine in ENGINES.items() if engine.model is not None]
-    failed = [name for name, engine in ENGINES.items() if engine.model is None]
+    status = engine_status()
+    loaded = [name for name, state in status.items() if state == "loaded"]
+    failed = [name for name, state in status.items() if state == "failed"]
     
     print("="*60)
-    print(f"INFO: Successfully loaded: {', '.join(loaded) if loaded else 'None'}")
+    print(f"INFO: Successfully loaded: {', '.join(loaded) if loaded else 'None'} in {time.perf_counter() - started:.1f}s")
+    log_memory("after model load")
     if failed:
         print(f"[FAILED] Could not load: {', '.join(failed)}")
     print("="*60)
@@ -116,7 +513,92 @@ def load_all_models():
     return ENGINES
 
 
-def get_engine(model_type: str):
-    """Get the appropriate ML engine for a business type"""
-    return ENGINES.get(model_type)
+def _load_engines(model_types, on_loaded=None):
+    """Load engines concurrently; weight reads and most torch work release the GIL"""
+    def load(model_type):
+        try:
+            get_engine(model_type)
+        finally:
+            if on_loaded:
+                on_loaded(model_type)
+
+    workers = min(len(model_types), ML_LOAD_PARALLELISM or len(model_types))
+    if workers <= 1:
+        for model_type in model_types:
+            load(model_type)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load") as pool:
+        list(pool.map(load, model_types))
+
+
+def warmup_model_types():
+    """Model types named by ML_WARMUP, in order"""
+    if ML_WARMUP.strip() == "all":
+        return list(MODEL_FOLDERS)
+    return [name.strip() for name in ML_WARMUP.split(",") if name.strip() in MODEL_FOLDERS]
+
+
+def preload_model_types():
+    """Engines to load before forking: ML_WARMUP (or all), capped at ML_MAX_RESIDENT_ENGINES"""
+    model_types = warmup_model_types() or list(MODEL_FOLDERS)
+    if 0 < ML_MAX_RESIDENT_ENGINES < len(model_types):
+        # Engines evicted before the fork would not stay shared
+        print(f"Warning: Preloading only {', '.join(model_types[:ML_MAX_RESIDENT_ENGINES])} "
+              f"(ML_MAX_RESIDENT_ENGINES={ML_MAX_RESIDENT_ENGINES})")
+        model_types = model_types[:ML_MAX_RESIDENT_ENGINES]
+    return model_types
+
+
+def start_warmup(model_types=None):
+    """Load the ML_WARMUP engines in a background thread"""
+    if model_types is None:
+        model_types = warmup_model_types()
+    if not model_types:
+        return
+    
+
+    with _engines_lock:
+        _warmup_pending.update(model_types)
+    
+    def loaded(model_type):
+        with _engines_lock:
+            _warmup_pending.discard(model_type)
+    
+    def warm():
+        started = time.perf_counter()
+        _load_engines(model_types, loaded)
+        print(f"INFO: Warm-up finished: {', '.join(model_types)} in {time.perf_counter() - started:.1f}s")
+        log_memory("after warm-up")
+    
+    threading.Thread(target=warm, daemon=True).start()
+
+
+def engine_status():
+    """State of every known engine: loaded, loading, failed or not_loaded"""
+    with _engines_lock:
+        status = {}
+        for model_type in MODEL_FOLDERS:
+            engine = ENGINES.get(model_type)
+            if engine is not None:
+                status[model_type] = "loaded" if engine.model is not None else "failed"
+            elif model_type in _loading:
+                status[model_type] = "loading"
+            else:
+                status[model_type] = "not_loaded"
+        return status
+
+
+def engines_ready():
+    """True once background warm-up has finished"""
+    with _engines_lock:
+        return not _warmup_pending
+
+
+if __name__ == "__main__":
+    import sys
 
+    if len(sys.argv) < 2 or sys.argv[1] != "export-mmap":
+        print("Usage: python ml_engine.py export-mmap [model_type ...]")
+        sys.exit(2)
+    for model_type in sys.argv[2:] or list(MODEL_FOLDERS):
+        export_mmap_weights(model_type)
@@ -0,0 +1,146 @@
+"""
+Cross-process signalling over PostgreSQL LISTEN/NOTIFY
+- Review events are NOTIFYed on a per-business channel. Every API process LISTENs on the
+  channels of the businesses that currently have local WebSocket clients.
+- Inserts into raw_reviews NOTIFY REVIEW_QUEUE_CHANNEL so idle queue workers wake at once.
+"""
+import hashlib
+import json
+import os
+import select
+import threading
+import time
+import psycopg2
+from db_config import DATABASE_CONFIG
+
+# "postgres" delivers events to every API process/node, "local" only within this process
+WS_EVENTS_BACKEND = os.getenv('WS_EVENTS_BACKEND', 'postgres')
+
+# Fired by a statement-level trigger on raw_reviews inserts
+REVIEW_QUEUE_CHANNEL = "raw_reviews_pending"
+
+# NOTIFY payloads are limited to 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+
+def channel_for(business_id):
+    """Bounded, identifier-safe channel name for a business"""
+    return "review_events_" + hashlib.sha1(business_id.encode("utf-8")).hexdigest()[:16]
+
+
+def notify(cursor, business_id, message):
+    """Queue an event for delivery when the cursor's transaction commits"""
+    payload = json.dumps({"business_id": business_id, "message": message}, default=str)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        message = {**message, "data": {k: v for k, v in message.get("data", {}).items() if k != "preview"}}
+        payload = json.dumps({"business_id": business_id, "message": message}, default=str)
+    cursor.execute("SELECT pg_notify(%s, %s)", (channel_for(business_id), payload))
+
+
+class PgListener:
+    """Background thread holding one LISTEN connection; subclasses pick channels and handle notifications"""
+
+    def __init__(self, poll_seconds=0.5):
+        self.poll_seconds = poll_seconds
+        self._listening = set()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def channels(self):
+        raise NotImplementedError
+
+    def handle(self, notification):
+        raise NotImplementedError
+
+    def on_connect(self):
+        """Called after every (re)connect; notifications may have been missed meanwhile"""
+
+    def _sync_channels(self, cursor):
+        wanted = self.channels()
+        for channel in wanted - self._listening:
+            cursor.execute(f"LISTEN {channel}")
+        for channel in self._listening - wanted:
+            cursor.execute(f"UNLISTEN {channel}")
+        self._listening = wanted
+
+    def _run(self):
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**DATABASE_CONFIG)
+                conn.autocommit = True
+                cursor = conn.cursor()
+                self._listening = set()
+                self._sync_channels(cursor)
+                self.on_connect()
+                while not self._stopped.is_set():
+                    self._sync_channels(cursor)
+                    if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        try:
+                            self.handle(notification)
+                        except Exception as e:
+                            print(f"Warning: Bad notification on {notification.channel}: {e}")
+            except Exception as e:
+                print(f"ERROR: {type(self).__name__}: {e}")
+                time.sleep(1)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+class PgEventListener(PgListener):
+    """LISTENs on the channels of businesses with local clients and hands events to the bus"""
+
+    def __init__(self, on_event, poll_seconds=0.5):
+        super().__init__(poll_seconds)
+        self.on_event = on_event
+        self._wanted = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, business_id):
+        with self._lock:
+            self._wanted.add(channel_for(business_id))
+
+    def unsubscribe(self, business_id):
+        with self._lock:
+            self._wanted.discard(channel_for(business_id))
+
+    def channels(self):
+        with self._lock:
+            return set(self._wanted)
+
+    def on_connect(self):
+        print("INFO: Listening for review events via PostgreSQL NOTIFY")
+
+    def handle(self, notification):
+        event = json.loads(notification.payload)
+        self.on_event(event["message"], event["business_id"])
+
+
+class QueueWakeListener(PgListener):
+    """Calls on_wake whenever rows are inserted into raw_reviews (see migration 5 trigger)"""
+
+    def __init__(self, on_wake, poll_seconds=1.0):
+        super().__init__(poll_seconds)
+        self.on_wake = on_wake
+
+    def channels(self):
+        return {REVIEW_QUEUE_CHANNEL}
+
+    def on_connect(self):
+        # Catch up on anything inserted while the connection was down
+        self.on_wake()
+
+    def handle(self, notification):
+        self.on_wake()
@@ -0,0 +1,135 @@
+"""
+Response cache for the dashboard endpoints (/stats, /analytics)
+Entries are keyed by (business_id, endpoint, period) and hold the serialized body plus a
+content ETag. Each business has a generation number that is bumped when new reviews for it
+are committed; entries computed under an older generation are never served.
+    RESPONSE_CACHE_BACKEND=memory    invalidations stay in this process (others wait for the TTL)
+    RESPONSE_CACHE_BACKEND=postgres  invalidations are NOTIFYed in the writing transaction and
+                                     applied by every API process
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from metrics import Counter
+from pg_events import PgListener
+
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2000'))
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'postgres')
+
+RESPONSE_CACHE_CHANNEL = "response_cache_invalidate"
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Dashboard responses by cache outcome", ["endpoint", "result"]
+)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "generation", "expires")
+
+    def __init__(self, body, generation, expires):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.generation = generation
+        self.expires = expires
+
+
+class ResponseCache:
+    """TTL + LRU cache of serialized responses with per-business generations"""
+
+    def __init__(self, capacity=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        # Bumped by clear(): invalidates every business, including computations in flight
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def _current(self, business_id):
+        return (self._epoch, self._generations.get(business_id, 0))
+
+    def generation(self, business_id):
+        """Read before computing a response; pass the value to put()"""
+        with self._lock:
+            return self._current(business_id)
+
+    def get(self, business_id, endpoint, period=None):
+        key = (business_id, endpoint, period)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.monotonic() or entry.generation != self._current(business_id):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, business_id, endpoint, period, generation, body):
+        """Store a serialized body computed under `generation`; returns the entry"""
+        entry = CachedResponse(body, generation, time.monotonic() + self.ttl)
+        key = (business_id, endpoint, period)
+        with self._lock:
+            # Invalidated while computing: serve this body once but do not keep it
+            if generation != self._current(business_id):
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, business_ids):
+        """Drop every cached response of the given businesses"""
+        with self._lock:
+            for business_id in business_ids:
+                self._generations[business_id] = self._generations.get(business_id, 0) + 1
+            # Stale entries are dropped lazily by get(); clear them now when cheap
+            for key in [key for key in self._entries if key[0] in business_ids]:
+                del self._entries[key]
+
+    def notify_invalidation(self, cursor, business_ids):
+        """Queue cross-process invalidation; delivered when the cursor's transaction commits"""
+        if RESPONSE_CACHE_BACKEND != "postgres":
+            return
+        for business_id in sorted(business_ids):
+            cursor.execute("SELECT pg_notify(%s, %s)", (RESPONSE_CACHE_CHANNEL, business_id))
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+
+def if_none_match(header, etag):
+    """True if an If-None-Match header value matches `etag`"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return any(value.removeprefix("W/") == etag for value in candidates)
+
+
+class InvalidationListener(PgListener):
+    """Applies invalidations NOTIFYed by other API processes"""
+
+    def __init__(self, cache, poll_seconds=1.0):
+        super().__init__(poll_seconds)
+        self.cache = cache
+
+    def channels(self):
+        return {RESPONSE_CACHE_CHANNEL}
+
+    def on_connect(self):
+        # Invalidations may have been missed while disconnected
+        self.cache.clear()
+
+    def handle(self, notification):
+        self.cache.invalidate({notification.payload})
+
+
+RESPONSE_CACHE = ResponseCache()
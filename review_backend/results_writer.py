@@ -0,0 +1,82 @@
+"""
+Batched persistence of analyzed reviews
+Writes reviews, their aspect rows, rollup counters and raw_reviews status for many
+analyzed reviews with multi-row statements inside the caller's transaction.
+Writes are idempotent on reviews.raw_review_id (unique, see migration 6): a review that
+was already persisted by an earlier attempt or a duplicate claim is only marked completed.
+"""
+import uuid
+from psycopg2.extras import execute_values
+import rollups
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+
+def dominant_sentiment(analysis_items):
+    """Most frequent aspect sentiment, neutral when there are no aspects"""
+    counts = {sentiment: 0 for sentiment in SENTIMENTS}
+    for item in analysis_items:
+        sentiment = item.get("sentiment", "neutral").lower()
+        if sentiment in counts:
+            counts[sentiment] += 1
+    best = max(counts, key=counts.get)
+    return best if counts[best] > 0 else "neutral"
+
+
+def write_results(cursor, results):
+    """
+    Persist analyzed reviews; returns the results that were newly written.
+    Each result is a dict with raw_review_id, business_id, text, customer_name, rating,
+    date, sentiment and analysis (list of aspect items).
+    """
+    if not results:
+        return []
+
+    # Last result wins if the same raw review shows up twice in one batch
+    by_raw_id = {result["raw_review_id"]: result for result in results}
+    review_ids = {raw_id: str(uuid.uuid4()) for raw_id in by_raw_id}
+
+    inserted = execute_values(cursor, '''
+        INSERT INTO reviews
+        (id, raw_review_id, business_id, text, customer_name, rating, date, overall_sentiment)
+        VALUES %s
+        ON CONFLICT (raw_review_id) DO NOTHING
+        RETURNING raw_review_id
+    ''', [
+        (review_ids[raw_id], raw_id, r["business_id"], r["text"], r["customer_name"],
+         r["rating"], r["date"], r["sentiment"])
+        for raw_id, r in by_raw_id.items()
+    ], fetch=True)
+    written = [by_raw_id[row[0]] for row in inserted]
+
+    # Aspects and rollups only for reviews this call inserted, so retries never double count
+    aspect_rows = [
+        (review_ids[r["raw_review_id"]], item.get("term", ""), item.get("category", "general"),
+         item.get("sentiment", "neutral"))
+        for r in written
+        for item in r["analysis"]
+    ]
+    if aspect_rows:
+        execute_values(cursor, '''
+            INSERT INTO aspect_sentiments (review_id, aspect_term, category, sentiment)
+            VALUES %s
+        ''', aspect_rows)
+
+    rollups.record_reviews(cursor, [
+        (r["business_id"], r["date"], r["sentiment"], r["analysis"]) for r in written
+    ])
+
+    cursor.execute(
+        "UPDATE raw_reviews SET status = 'completed' WHERE id = ANY(%s)",
+        (list(by_raw_id),)
+    )
+    return written
+
+
+def mark_failed(cursor, raw_review_ids):
+    """Mark raw reviews as failed unless they were already completed"""
+    if raw_review_ids:
+        cursor.execute(
+            "UPDATE raw_reviews SET status = 'failed' WHERE id = ANY(%s) AND status <> 'completed'",
+            (list(raw_review_ids),)
+        )
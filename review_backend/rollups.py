@@ -0,0 +1,175 @@
+"""
+Incrementally maintained per-business, per-day sentiment rollups
+review_rollups holds one counter row per (business_id, day, category, sentiment).
+Overall review sentiment is stored under the OVERALL_CATEGORY sentinel.
+Usage:
+    python rollups.py rebuild [business_id]
+"""
+import datetime
+import sys
+from datetime import timedelta
+from psycopg2.extras import execute_values
+
+# Category sentinel for rows counting reviews by overall_sentiment
+OVERALL_CATEGORY = "*"
+
+# Days covered by each analytics period, counting today ("all" is unbounded)
+PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+
+CREATE_ROLLUP_TABLE = '''
+    CREATE TABLE IF NOT EXISTS review_rollups (
+        business_id VARCHAR(255) NOT NULL,
+        day DATE NOT NULL,
+        category VARCHAR(100) NOT NULL,
+        sentiment VARCHAR(50) NOT NULL,
+        mentions INTEGER NOT NULL DEFAULT 0,
+        reviews INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (business_id, day, category, sentiment)
+    )
+'''
+
+
+def _normalize_sentiment(sentiment):
+    return (sentiment or "neutral").lower()
+
+
+def record_review(cursor, business_id, review_date, overall_sentiment, analysis_items):
+    """Add one analyzed review to the rollups (call inside the review insert transaction)"""
+    record_reviews(cursor, [(business_id, review_date, overall_sentiment, analysis_items)])
+
+
+def record_reviews(cursor, reviews):
+    """Add analyzed reviews, given as (business_id, date, overall_sentiment, analysis_items), in one statement"""
+    # mentions counts aspect rows, reviews counts distinct reviews per (category, sentiment)
+    counters = {}
+    for business_id, review_date, overall_sentiment, analysis_items in reviews:
+        day = review_date.date() if review_date else datetime.date.today()
+        review_counters = {(OVERALL_CATEGORY, _normalize_sentiment(overall_sentiment)): 1}
+        for item in analysis_items:
+            category = item.get("category", "general")
+            if not category or category == OVERALL_CATEGORY:
+                continue
+            key = (category, _normalize_sentiment(item.get("sentiment")))
+            review_counters[key] = review_counters.get(key, 0) + 1
+
+        # Keys must be unique within the statement for ON CONFLICT DO UPDATE
+        for (category, sentiment), mentions in review_counters.items():
+            totals = counters.setdefault((business_id, day, category, sentiment), [0, 0])
+            totals[0] += mentions
+            totals[1] += 1
+
+    if not counters:
+        return
+    # Upsert in primary key order so concurrent writers lock shared rows in the same order
+    execute_values(cursor, '''
+        INSERT INTO review_rollups (business_id, day, category, sentiment, mentions, reviews)
+        VALUES %s
+        ON CONFLICT (business_id, day, category, sentiment) DO UPDATE
+        SET mentions = review_rollups.mentions + EXCLUDED.mentions,
+            reviews = review_rollups.reviews + EXCLUDED.reviews
+    ''', [
+        (business_id, day, category, sentiment, mentions, review_count)
+        for (business_id, day, category, sentiment), (mentions, review_count) in sorted(counters.items())
+    ])
+
+
+def rebuild_rollups(cursor, business_id=None):
+    """Recompute review_rollups from reviews and aspect_sentiments"""
+    # Block live increments until the rebuilt rows are committed
+    cursor.execute("LOCK TABLE review_rollups IN EXCLUSIVE MODE")
+
+    scope = ""
+    params = []
+    if business_id:
+        scope = " AND r.business_id = %s"
+        params = [business_id]
+
+    cursor.execute(f"DELETE FROM review_rollups r WHERE TRUE{scope}", params)
+    cursor.execute(f'''
+        INSERT INTO review_rollups (business_id, day, category, sentiment, mentions, reviews)
+        SELECT r.business_id, COALESCE(r.date::date, CURRENT_DATE), %s,
+               COALESCE(LOWER(r.overall_sentiment), 'neutral'), COUNT(*), COUNT(*)
+        FROM reviews r
+        WHERE TRUE{scope}
+        GROUP BY 1, 2, 3, 4
+    ''', [OVERALL_CATEGORY] + params)
+    cursor.execute(f'''
+        INSERT INTO review_rollups (business_id, day, category, sentiment, mentions, reviews)
+        SELECT r.business_id, COALESCE(r.date::date, CURRENT_DATE), a.category,
+               COALESCE(LOWER(a.sentiment), 'neutral'), COUNT(*), COUNT(DISTINCT r.id)
+        FROM aspect_sentiments a
+        JOIN reviews r ON a.review_id = r.id
+        WHERE a.category IS NOT NULL AND a.category <> '' AND a.category <> %s{scope}
+        GROUP BY 1, 2, 3, 4
+    ''', [OVERALL_CATEGORY] + params)
+
+
+def period_start(period):
+    """First day included in an analytics period, or None for all time"""
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        return None
+    return datetime.date.today() - timedelta(days=days - 1)
+
+
+def fetch_overall_counts(cursor, business_id, since=None, trend_days=()):
+    """Return (total, positive, negative, [positive per trend day]) from the overall rows"""
+    day_filter = ""
+    params = []
+    if since:
+        day_filter = " AND day >= %s"
+        params.append(since)
+
+    trend_columns = "".join(
+        ",\n            COALESCE(SUM(reviews) FILTER (WHERE sentiment = 'positive' AND day = %s), 0)"
+        for _ in trend_days
+    )
+
+    cursor.execute(f'''
+        SELECT
+            COALESCE(SUM(reviews), 0),
+            COALESCE(SUM(reviews) FILTER (WHERE sentiment = 'positive'), 0),
+            COALESCE(SUM(reviews) FILTER (WHERE sentiment = 'negative'), 0){trend_columns}
+        FROM review_rollups
+        WHERE business_id = %s AND category = %s{day_filter}
+    ''', list(trend_days) + [business_id, OVERALL_CATEGORY] + params)
+    row = cursor.fetchone()
+    return row[0], row[1], row[2], list(row[3:])
+
+
+def fetch_category_counts(cursor, business_id, since=None):
+    """Return rows of (category, positive, negative, neutral, negative_reviews)"""
+    day_filter = ""
+    params = [business_id, OVERALL_CATEGORY]
+    if since:
+        day_filter = " AND day >= %s"
+        params.append(since)
+
+    cursor.execute(f'''
+        SELECT
+            category,
+            COALESCE(SUM(mentions) FILTER (WHERE sentiment = 'positive'), 0),
+            COALESCE(SUM(mentions) FILTER (WHERE sentiment = 'negative'), 0),
+            COALESCE(SUM(mentions) FILTER (WHERE sentiment = 'neutral'), 0),
+            COALESCE(SUM(reviews) FILTER (WHERE sentiment = 'negative'), 0)
+        FROM review_rollups
+        WHERE business_id = %s AND category <> %s{day_filter}
+        GROUP BY category
+        ORDER BY category
+    ''', params)
+    return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    from db_config import get_db_connection
+
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Usage: python rollups.py rebuild [business_id]")
+        sys.exit(1)
+
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(CREATE_ROLLUP_TABLE)
+            rebuild_rollups(cursor, target)
+    print(f"INFO: Rollups rebuilt for {target or 'all businesses'}")
@@ -0,0 +1,157 @@
+"""
+Opt-in per-request tracing with a slow-trace log
+A trace collects spans for SQL statements (via TracingCursor), generate calls and
+response serialization. Traces slower than TRACE_SLOW_MS are written as one JSON line
+each to TRACE_LOG (or stdout).
+    TRACE_MODE=off      no tracing (default)
+    TRACE_MODE=sample   trace TRACE_SAMPLE_RATE of requests plus any with an "X-Trace: 1" header
+    TRACE_MODE=all      trace every request
+"""
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from psycopg2.extensions import cursor as _BaseCursor
+
+TRACE_MODE = os.getenv('TRACE_MODE', 'off')
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.01'))
+TRACE_SLOW_MS = float(os.getenv('TRACE_SLOW_MS', '500'))
+TRACE_LOG = os.getenv('TRACE_LOG', '')
+# Bounds memory per trace (e.g. an N+1 loop issuing thousands of statements)
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', '500'))
+TRACE_SQL_CHARS = 1000
+
+_current = contextvars.ContextVar("trace", default=None)
+_log_lock = threading.Lock()
+
+
+def enabled():
+    return TRACE_MODE in ("sample", "all")
+
+
+def should_trace(forced=False):
+    """Sampling decision for a new request or job"""
+    if TRACE_MODE == "all":
+        return True
+    if TRACE_MODE == "sample":
+        return forced or random.random() < TRACE_SAMPLE_RATE
+    return False
+
+
+class Trace:
+    def __init__(self, name):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []
+        self.dropped = 0
+        self.attributes = {}
+
+    def add_span(self, kind, name, started, ended, **attributes):
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append({
+            "kind": kind,
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round((ended - started) * 1000, 3),
+            **attributes,
+        })
+
+    def summary(self):
+        """Trace as a JSON-able dict with time per span kind and the unattributed remainder"""
+        by_kind = {}
+        for span in self.spans:
+            by_kind[span["kind"]] = by_kind.get(span["kind"], 0.0) + span["duration_ms"]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "by_kind_ms": {kind: round(ms, 3) for kind, ms in by_kind.items()},
+            # Python work (aggregation, encoding) that no span covers
+            "other_ms": round(max(0.0, self.duration_ms - sum(by_kind.values())), 3),
+            "attributes": self.attributes,
+            "spans": self.spans,
+            "dropped_spans": self.dropped,
+        }
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def trace(name, active=True):
+    """Make a trace current for the block (work in run_in_threadpool inherits it)"""
+    if not active:
+        yield None
+        return
+    current = Trace(name)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+        current.duration_ms = round((time.perf_counter() - current.started) * 1000, 3)
+        if current.duration_ms >= TRACE_SLOW_MS:
+            _write(current.summary())
+
+
+@contextmanager
+def span(kind, name="", **attributes):
+    """Record a span on the current trace; a no-op when nothing is being traced"""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add_span(kind, name, started, time.perf_counter(), **attributes)
+
+
+def _write(summary):
+    line = json.dumps(summary, default=str)
+    with _log_lock:
+        if TRACE_LOG:
+            try:
+                with open(TRACE_LOG, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                return
+            except OSError as e:
+                print(f"Warning: Cannot write trace log {TRACE_LOG}: {e}")
+        print(f"TRACE: {line}")
+
+
+class TracingCursor(_BaseCursor):
+    """Cursor recording each statement (text, duration, rowcount) as a span of the current trace"""
+
+    def _traced(self, method, query, *args):
+        current = _current.get()
+        if current is None:
+            return method(query, *args)
+        started = time.perf_counter()
+        try:
+            return method(query, *args)
+        finally:
+            sql = query.decode("utf-8", "replace") if isinstance(query, bytes) else str(query)
+            current.add_span(
+                "sql", self.name or "", started, time.perf_counter(),
+                statement=" ".join(sql.split())[:TRACE_SQL_CHARS], rowcount=self.rowcount
+            )
+
+    def execute(self, query, vars=None):
+        return self._traced(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._traced(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._traced(super().copy_expert, sql, file, size)